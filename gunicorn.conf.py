@@ -0,0 +1,14 @@
+# إعدادات Gunicorn للإنتاج: gunicorn wsgi:app
+# عمّال gevent: الطلبات تقضي معظم وقتها في انتظار MySQL، فتتداخل فترات الانتظار داخل كل عامل
+import os
+
+# عدد ثابت وصغير من العمّال: التزامن يأتي من gevent داخل كل عامل، وكل عامل يفتح Pool اتصالات كاملاً.
+# cpu_count() يعيد أنوية المضيف داخل الحاويات، فلا يُعتمد عليه هنا.
+# server.py يقرأ WEB_CONCURRENCY ليقسم DB_MAX_CONNECTIONS على العمّال عند تحديد DB_POOL_SIZE.
+os.environ.setdefault('WEB_CONCURRENCY', '3')
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = 'gevent'
+workers = int(os.environ['WEB_CONCURRENCY'])
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', 1000))
+timeout = 30
@@ -0,0 +1,75 @@
+-- HawkStudio - إنشاء الجداول والبيانات الأساسية
+-- يُطبَّق مرة واحدة عند النشر: mysql -h $DB_HOST -u $DB_USER -p $DB_NAME < migrations/001_init.sql
+-- آمن لإعادة التشغيل (idempotent): CREATE TABLE IF NOT EXISTS و ON DUPLICATE KEY UPDATE
+-- يجب أن يبقى متطابقاً مع استعلامات _Q_CREATE_* وإعدادات fix_database_issues في server.py
+
+SET NAMES utf8mb4;
+
+CREATE TABLE IF NOT EXISTS projects (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    category VARCHAR(100) DEFAULT 'website',
+    description TEXT NOT NULL,
+    technologies TEXT,
+    client VARCHAR(255),
+    project_date DATE,
+    project_url VARCHAR(500),
+    image_url VARCHAR(500),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    is_active BOOLEAN DEFAULT TRUE,
+    INDEX idx_active_created (is_active, created_at),
+    INDEX idx_created (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS project_requests (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    project_type VARCHAR(100) DEFAULT 'website',
+    description TEXT NOT NULL,
+    status VARCHAR(50) DEFAULT 'new',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_status_created (status, created_at),
+    INDEX idx_created (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS admin_users (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(100) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    full_name VARCHAR(255),
+    email VARCHAR(255),
+    role VARCHAR(50) DEFAULT 'admin',
+    last_login TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_active BOOLEAN DEFAULT TRUE,
+    INDEX idx_username (username),
+    INDEX idx_active (is_active)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS settings (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    setting_key VARCHAR(100) UNIQUE NOT NULL,
+    setting_value TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_key (setting_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+-- مستخدم admin الافتراضي (كلمة المرور: admin123 - يجب تغييرها بعد أول تسجيل دخول)
+INSERT INTO admin_users (username, password_hash, full_name, email, role, is_active)
+VALUES ('admin', '$2b$10$R785jknVE5Me11kuxp72Ouh/dpBhDk46YN8QP0Z.ZWYQ/11lh6TBu', 'المسؤول الرئيسي', 'admin@hawkstudio.com', 'admin', TRUE)
+ON DUPLICATE KEY UPDATE username = username;
+
+-- الإعدادات الأساسية (لا تُستبدل القيم الموجودة)
+INSERT INTO settings (setting_key, setting_value) VALUES
+    ('site_title', 'HawkStudio'),
+    ('site_description', 'هندسة الويب بمنهجية البرمجيات أولاً'),
+    ('admin_email', 'admin@hawkstudio.com'),
+    ('contact_email', 'hawkstudiio@gmail.com'),
+    ('contact_phone', '+961 71 235 414'),
+    ('contact_address', 'لبنان - البقاع - تعلبايا'),
+    ('maintenance_mode', 'disabled'),
+    ('maintenance_message', 'نحن نقوم بإجراء بعض التحسينات على الموقع وسنعود قريباً.')
+ON DUPLICATE KEY UPDATE setting_key = setting_key;
@@ -0,0 +1,27 @@
+-- HawkStudio - فهرس مركّب لقائمة المشاريع النشطة
+-- يُطبَّق بعد 001_init.sql: mysql -h $DB_HOST -u $DB_USER -p $DB_NAME < migrations/002_projects_active_created_index.sql
+-- يسمح لاستعلام WHERE is_active = TRUE ORDER BY created_at DESC LIMIT 12 بمسح نطاق من الفهرس بدلاً من filesort
+-- آمن لإعادة التشغيل (idempotent): يتحقق من information_schema قبل إضافة الفهرس أو حذفه
+
+SET @has_active_created = (
+    SELECT COUNT(*) FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'projects' AND INDEX_NAME = 'idx_active_created'
+);
+SET @sql = IF(@has_active_created = 0,
+    'ALTER TABLE projects ADD INDEX idx_active_created (is_active, created_at)',
+    'DO 0');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- idx_active أصبح مكرراً: الفهرس المركّب يبدأ بالعمود is_active
+SET @has_active = (
+    SELECT COUNT(*) FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'projects' AND INDEX_NAME = 'idx_active'
+);
+SET @sql = IF(@has_active > 0,
+    'ALTER TABLE projects DROP INDEX idx_active',
+    'DO 0');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
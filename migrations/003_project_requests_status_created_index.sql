@@ -0,0 +1,27 @@
+-- HawkStudio - فهرس مركّب لطلبات المشاريع حسب الحالة
+-- يُطبَّق بعد 002: mysql -h $DB_HOST -u $DB_USER -p $DB_NAME < migrations/003_project_requests_status_created_index.sql
+-- يخدم عدّ الطلبات حسب الحالة وعرضها مرتبة بالأحدث (status = ? ORDER BY created_at DESC)
+-- آمن لإعادة التشغيل (idempotent): يتحقق من information_schema قبل إضافة الفهرس أو حذفه
+
+SET @has_status_created = (
+    SELECT COUNT(*) FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'project_requests' AND INDEX_NAME = 'idx_status_created'
+);
+SET @sql = IF(@has_status_created = 0,
+    'ALTER TABLE project_requests ADD INDEX idx_status_created (status, created_at)',
+    'DO 0');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- idx_status أصبح مكرراً: الفهرس المركّب يبدأ بالعمود status
+SET @has_status = (
+    SELECT COUNT(*) FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'project_requests' AND INDEX_NAME = 'idx_status'
+);
+SET @sql = IF(@has_status > 0,
+    'ALTER TABLE project_requests DROP INDEX idx_status',
+    'DO 0');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -1,33 +1,321 @@
-from flask import Flask, request, jsonify, send_from_directory, redirect
+from flask import Flask, Response, request, jsonify, send_from_directory, redirect, g
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
+from flask_caching import Cache
+from werkzeug.exceptions import HTTPException
 import os
-import uuid
-from datetime import datetime, timedelta
+import hashlib
+import itertools
+from datetime import datetime
+from decimal import Decimal
 import bcrypt
 import jwt
+import orjson
 from functools import wraps
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import mysql.connector
 from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
 import sys
+import time
+import threading
+import logging
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
 
 # ============================================================================
 # إعدادات البيئة
 # ============================================================================
 
+# قراءة بيئة التشغيل مرة واحدة عند الإقلاع
+_IS_RENDER = os.getenv("RENDER") == "true"
+
+# السجلات تُكتب عبر طابور وخيط خلفي (QueueListener) حتى لا تنتظر الطلبات الكتابة على stdout
+logger = logging.getLogger('hawkstudio')
+if not logger.handlers:
+    _log_queue = queue.Queue(-1)
+    _log_stream_handler = logging.StreamHandler(sys.stdout)
+    _log_stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    _log_listener = QueueListener(_log_queue, _log_stream_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    logger.addHandler(QueueHandler(_log_queue))
+    logger.propagate = False
+logger.setLevel(logging.INFO)
+
 # تحميل المتغيرات البيئية فقط في البيئة المحلية
-if os.getenv("RENDER") != "true":
+if not _IS_RENDER:
     try:
         load_dotenv()
-        print("[ENV] تم تحميل متغيرات البيئة من ملف .env")
+        logger.info("[ENV] تم تحميل متغيرات البيئة من ملف .env")
     except:
-        print("[ENV] لم يتم العثور على ملف .env")
+        logger.info("[ENV] لم يتم العثور على ملف .env")
+
+# مستوى السجلات: WARNING في الإنتاج لإخفاء الرسائل المعلوماتية، INFO محلياً
+try:
+    logger.setLevel(os.getenv('LOG_LEVEL', 'WARNING' if _IS_RENDER else 'INFO').upper())
+except ValueError:
+    logger.setLevel(logging.INFO)
+
+# تشغيل إعداد الجداول والبيانات الأساسية عند الإقلاع؛ في الإنتاج تُطبَّق migrations/*.sql عند النشر بدلاً من ذلك
+_RUN_MIGRATIONS = os.getenv("RUN_MIGRATIONS", "false" if _IS_RENDER else "true") == "true"
+
+# ============================================================================
+# استعلامات SQL الثابتة
+# ============================================================================
+
+_Q_CREATE_PROJECTS = """
+    CREATE TABLE IF NOT EXISTS projects (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        title VARCHAR(255) NOT NULL,
+        category VARCHAR(100) DEFAULT 'website',
+        description TEXT NOT NULL,
+        technologies TEXT,
+        client VARCHAR(255),
+        project_date DATE,
+        project_url VARCHAR(500),
+        image_url VARCHAR(500),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        is_active BOOLEAN DEFAULT TRUE,
+        INDEX idx_active_created (is_active, created_at),
+        INDEX idx_created (created_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci
+"""
+
+_Q_CREATE_PROJECT_REQUESTS = """
+    CREATE TABLE IF NOT EXISTS project_requests (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        project_type VARCHAR(100) DEFAULT 'website',
+        description TEXT NOT NULL,
+        status VARCHAR(50) DEFAULT 'new',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        INDEX idx_status_created (status, created_at),
+        INDEX idx_created (created_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci
+"""
+
+_Q_CREATE_ADMIN_USERS = """
+    CREATE TABLE IF NOT EXISTS admin_users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(100) UNIQUE NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        full_name VARCHAR(255),
+        email VARCHAR(255),
+        role VARCHAR(50) DEFAULT 'admin',
+        last_login TIMESTAMP NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_active BOOLEAN DEFAULT TRUE,
+        INDEX idx_username (username),
+        INDEX idx_active (is_active)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci
+"""
+
+_Q_CREATE_SETTINGS = """
+    CREATE TABLE IF NOT EXISTS settings (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        setting_key VARCHAR(100) UNIQUE NOT NULL,
+        setting_value TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        INDEX idx_key (setting_key)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci
+"""
+
+_Q_CREATE_TABLES = (_Q_CREATE_PROJECTS, _Q_CREATE_PROJECT_REQUESTS, _Q_CREATE_ADMIN_USERS, _Q_CREATE_SETTINGS)
+
+_TABLE_NAMES = ('admin_users', 'settings', 'projects', 'project_requests')
+_Q_CHECK_TABLES = (
+    "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ("
+    + ", ".join(["%s"] * len(_TABLE_NAMES)) + ")"
+)
+_Q_SEED_ADMIN = """
+INSERT INTO admin_users (username, password_hash, full_name, email, role, is_active)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE username = username
+"""
+_Q_UPDATE_ADMIN_PASSWORD_HASH = "UPDATE admin_users SET password_hash = %s WHERE id = %s"
+_Q_GET_ACTIVE_ADMIN = """
+SELECT id, username, password_hash, full_name, email, role
+FROM admin_users
+WHERE username = %s AND is_active = TRUE
+LIMIT 1
+"""
+
+_Q_LIST_SETTINGS = "SELECT setting_key, setting_value FROM settings"
+# أعمدة محددة بدلاً من SELECT * : فقط ما تعرضه الواجهات
+_Q_LIST_ACTIVE_PROJECTS = """
+SELECT id, title, category, description, technologies, client, project_date, project_url, image_url, created_at
+FROM projects
+WHERE is_active = TRUE
+ORDER BY created_at DESC
+LIMIT 12
+"""
+# قوائم لوحة التحكم قوالب: {where} و {limit} للتصفح بمؤشر (created_at, id) - انظر _list_page_query
+_Q_LIST_PROJECTS = """
+SELECT id, title, category, description, technologies, client, project_date, project_url, image_url, is_active, created_at
+FROM projects
+{where}
+ORDER BY created_at DESC, id DESC
+{limit}
+"""
+# عدد المشاريع التي ما زالت تستخدم صورة (الصور المتطابقة تُخزَّن في ملف واحد)
+_Q_COUNT_IMAGE_REFERENCES = "SELECT COUNT(*) AS refs FROM projects WHERE image_url = %s"
+_Q_GET_PROJECT_IMAGE = "SELECT image_url FROM projects WHERE id = %s"
+_Q_INSERT_PROJECT = """
+INSERT INTO projects (title, category, description, technologies, client, project_date, project_url, image_url, is_active)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+# قالب للتحديث الجزئي: {assignments} تُستبدل بـ "column = %s" للأعمدة التي تغيرت فقط
+_Q_UPDATE_PROJECT = """
+UPDATE projects SET {assignments}
+WHERE id = %s
+"""
+_Q_DELETE_PROJECT = "DELETE FROM projects WHERE id = %s"
+# قفل MySQL مسمّى لكل ملف صورة: يسلسل الإدراج والحذف على نفس الملف بين كل العمّال والعمليات
+_Q_GET_NAMED_LOCK = "SELECT GET_LOCK(%s, %s) AS acquired"
+_Q_RELEASE_NAMED_LOCK = "SELECT RELEASE_LOCK(%s) AS released"
+_Q_GET_PROJECT_EDITABLE = """
+SELECT title, category, description, technologies, client, project_date, project_url, is_active
+FROM projects
+WHERE id = %s
+"""
+# لوحة التحكم تعرض أول 50 حرفاً فقط من الوصف في القائمة؛ الوصف الكامل يُجلب مع تفاصيل الطلب
+_Q_LIST_PROJECT_REQUESTS = """
+SELECT id, name, email, project_type, LEFT(description, 100) AS description, status, created_at
+FROM project_requests
+{where}
+ORDER BY created_at DESC, id DESC
+{limit}
+"""
+_Q_GET_PROJECT_REQUEST = """
+SELECT id, name, email, project_type, description, status, created_at, updated_at
+FROM project_requests
+WHERE id = %s
+"""
+_Q_INSERT_PROJECT_REQUEST = """
+INSERT INTO project_requests (name, email, project_type, description)
+VALUES (%s, %s, %s, %s)
+"""
+_Q_UPDATE_REQUEST_STATUS = "UPDATE project_requests SET status = %s WHERE id = %s"
+_Q_DELETE_PROJECT_REQUEST = "DELETE FROM project_requests WHERE id = %s"
+# قالب لتحديث حالة عدة طلبات: {ids} تُستبدل بعدد من "%s" يساوي عدد المعرفات
+_Q_BULK_UPDATE_REQUEST_STATUS = """
+UPDATE project_requests SET status = %s
+WHERE id IN ({ids})
+"""
+# إحصائيات لوحة التحكم: العدادات الأربعة في رحلة واحدة لقاعدة البيانات
+_Q_GET_STATS = """
+SELECT
+    (SELECT COUNT(*) FROM projects) AS total_projects,
+    (SELECT COUNT(*) FROM projects WHERE is_active = TRUE) AS active_projects,
+    (SELECT COUNT(*) FROM project_requests) AS total_requests,
+    (SELECT COUNT(*) FROM project_requests WHERE status = 'new') AS new_requests
+"""
+_Q_RECENT_PROJECTS = """
+SELECT id, title, category, created_at
+FROM projects
+ORDER BY created_at DESC
+LIMIT 5
+"""
+_Q_RECENT_PROJECT_REQUESTS = """
+SELECT id, name, project_type, status, created_at
+FROM project_requests
+ORDER BY created_at DESC
+LIMIT 5
+"""
+_Q_SEED_SETTING = """
+INSERT INTO settings (setting_key, setting_value)
+VALUES (%s, %s)
+ON DUPLICATE KEY UPDATE setting_key = setting_key
+"""
+# قالب متعدد الصفوف: {rows} تُستبدل بعدد من "(%s, %s)" يساوي عدد الإعدادات
+_Q_UPSERT_SETTINGS = """
+INSERT INTO settings (setting_key, setting_value)
+VALUES {rows}
+ON DUPLICATE KEY UPDATE setting_value = VALUES(setting_value)
+"""
+
+# أسماء ثابتة للاستعلامات تُستخدم في السجلات بدلاً من نص الاستعلام
+_STATEMENT_LABELS = {
+    value: name[3:] for name, value in list(globals().items())
+    if name.startswith('_Q_') and isinstance(value, str)
+}
+# القوالب ({where} و {ids} ...) تُعرف بالنص الثابت الذي يسبق أول حقل بعد format()
+_STATEMENT_TEMPLATE_LABELS = tuple(
+    (query.split('{', 1)[0], label) for query, label in _STATEMENT_LABELS.items() if '{' in query
+)
+
+def _statement_label(query):
+    """Stable name of a known statement or template for log lines, or the first line of an ad-hoc query"""
+    label = _STATEMENT_LABELS.get(query)
+    if label is None:
+        label = next((name for prefix, name in _STATEMENT_TEMPLATE_LABELS if query.startswith(prefix)), None)
+    if label is None:
+        label = query.strip().split('\n', 1)[0]
+    return label
 
 # ============================================================================
 # قاعدة البيانات - الإصدار المُحسّن للإنتاج
 # ============================================================================
 
+class DatabaseUnavailableError(Exception):
+    """لا يوجد اتصال متاح بقاعدة البيانات"""
+
+# أقصى عمر لاتصال داخل الـ Pool قبل تجديده (أقل من wait_timeout في MySQL)
+MAX_CONNECTION_LIFETIME = 1800  # ثانية
+
+# مدة انتظار اتصال حر عندما تكون كل اتصالات الـ Pool مستعارة (mysql-connector يفشل فوراً بدونها)
+POOL_WAIT_TIMEOUT = 2  # ثانية
+
+def _socket_is_patched():
+    """True when running under gevent workers with the socket module monkey-patched"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('socket')
+
+# عدد جولات bcrypt عند تجزئة كلمات المرور (10 هو الحد الأدنى الموصى به من OWASP)
+try:
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 10))
+except ValueError:
+    BCRYPT_ROUNDS = 10
+
+# تجزئة وهمية بنفس التكلفة يُتحقق منها عند عدم وجود المستخدم حتى لا يكشف زمن الاستجابة أسماء المستخدمين
+DUMMY_HASH = bcrypt.hashpw(b'x', bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+# التحقق من bcrypt عمل حسابي ثقيل: عدد محدود من الخيوط حتى لا تستهلك موجة تسجيلات دخول كل المعالج
+_bcrypt_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix='hawkstudio-bcrypt')
+
+def _run_bcrypt(func, *args):
+    """Run a bcrypt call on a worker thread; under gevent on the hub's native threadpool so other greenlets keep running"""
+    if _socket_is_patched():
+        # تحت gevent تصبح خيوط ThreadPoolExecutor نفسها greenlets، فنستخدم خيوط النظام الحقيقية
+        import gevent
+        return gevent.get_hub().threadpool.apply(func, args)
+    return _bcrypt_pool.submit(func, *args).result()
+
+def check_password(password, hashed):
+    """bcrypt.checkpw off the request thread"""
+    return _run_bcrypt(bcrypt.checkpw, password, hashed)
+
+def hash_password(password):
+    """bcrypt.hashpw with BCRYPT_ROUNDS off the request thread"""
+    return _run_bcrypt(bcrypt.hashpw, password, bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+def _hash_rounds(hashed):
+    """Cost factor of a bcrypt hash ($2b$<rounds>$...), or None if it cannot be parsed"""
+    try:
+        return int(hashed.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
 class Database:
     def __init__(self):
         """تهيئة كائن قاعدة البيانات بدون اتصال مباشر"""
@@ -42,13 +330,33 @@ class Database:
         except ValueError:
             self.port = 3306
 
+        # mysql-connector يفتح كل اتصالات الـ Pool عند إنشائه، وكل عامل Gunicorn يملك Pool خاصاً به؛
+        # لذا يُقسَم إجمالي الاتصالات المسموح (DB_MAX_CONNECTIONS) على عدد العمّال (WEB_CONCURRENCY)
+        # بدلاً من ربط الحجم بعدد الأنوية (20 على الأكثر، وDB_POOL_SIZE يتجاوز الحساب)
+        try:
+            connection_budget = int(os.getenv('DB_MAX_CONNECTIONS', 60))
+            workers = int(os.getenv('WEB_CONCURRENCY', 1))
+        except ValueError:
+            connection_budget, workers = 60, 1
+        default_pool_size = min(max(1, connection_budget // max(1, workers)), 20)
+        try:
+            self.pool_size = int(os.getenv('DB_POOL_SIZE', default_pool_size))
+        except ValueError:
+            self.pool_size = default_pool_size
+        # mysql-connector لا يدعم max_overflow والحد الأقصى للـ Pool هو CNX_POOL_MAXSIZE
+        self.pool_size = max(1, min(self.pool_size, pooling.CNX_POOL_MAXSIZE))
+
         self.pool = None
         self._initialized = False
         self._connection_error = False
         self._error_count = 0
         self._max_retries = 3
         
-        print(f"[DB] تم تهيئة كائن قاعدة البيانات (اتصال مؤجل)")
+        # مُعلّم جاهزية الجداول - يُمسح فقط أثناء الإعداد في الخلفية
+        self._schema_ready = threading.Event()
+        self._schema_ready.set()
+        
+        logger.info("[DB] تم تهيئة كائن قاعدة البيانات (اتصال مؤجل)")
 
     def _init_pool(self):
         """تهيئة Connection Pool عند أول طلب"""
@@ -56,12 +364,14 @@ class Database:
             if self.pool:
                 return True
                 
-            print("[DB] محاولة تهيئة Connection Pool...")
+            logger.info("[DB] محاولة تهيئة Connection Pool...")
             
             pool_config = {
                 'pool_name': 'hawkstudio_pool',
-                'pool_size': 5,
-                'pool_reset_session': True,
+                'pool_size': self.pool_size,
+                # بدون COM_RESET_CONNECTION عند كل إعادة للـ Pool (رحلة إضافية لكل طلب)؛ الجلسة لا تحمل حالة:
+                # autocommit مفعّل، والمعاملات الصريحة تنتهي دائماً بـ commit أو rollback قبل إعادة الاتصال
+                'pool_reset_session': False,
                 'host': self.host,
                 'user': self.user,
                 'password': self.password,
@@ -70,7 +380,8 @@ class Database:
                 'charset': 'utf8mb4',
                 'use_unicode': True,
                 'autocommit': True,
-                'use_pure': True,
+                # امتداد C أسرع، لكنه يحجب الـ socket تحت gevent؛ عندها يُستخدم التنفيذ البايثوني القابل للـ monkey-patch
+                'use_pure': _socket_is_patched(),
                 'connection_timeout': 10,
                 'auth_plugin': 'mysql_native_password',
                 'connect_timeout': 5
@@ -81,7 +392,7 @@ class Database:
             self._connection_error = False
             self._error_count = 0
             
-            print(f"[DB] ✅ تم تهيئة Connection Pool بنجاح")
+            logger.info("[DB] ✅ تم تهيئة Connection Pool بنجاح (الحجم: %s)", self.pool_size)
             return True
             
         except Exception as e:
@@ -89,9 +400,9 @@ class Database:
             self._error_count += 1
             
             if self._error_count <= self._max_retries:
-                print(f"[DB] ❌ فشل في تهيئة Connection Pool ({self._error_count}/{self._max_retries}): {e}")
+                logger.error("[DB] ❌ فشل في تهيئة Connection Pool (%s/%s): %s", self._error_count, self._max_retries, e)
             else:
-                print(f"[DB] ⚠️  تم تعطيل الاتصال بقاعدة البيانات بعد {self._max_retries} محاولات فاشلة")
+                logger.warning("[DB] ⚠️  تم تعطيل الاتصال بقاعدة البيانات بعد %s محاولات فاشلة", self._max_retries)
             
             self.pool = None
             return False
@@ -110,293 +421,253 @@ class Database:
             
             # إذا كان الـ Pool موجودًا، حاول الحصول على اتصال
             if self.pool:
-                conn = self.pool.get_connection()
-                if conn.is_connected():
-                    return conn
-                else:
-                    print("[DB] ⚠️  الاتصال غير نشط، إعادة المحاولة...")
-                    conn.close()
+                try:
+                    return self._borrow_connection()
+                except PoolError:
+                    # كل الاتصالات مشغولة حتى بعد الانتظار - ضغط مؤقت وليس عطلاً في قاعدة البيانات
+                    logger.warning("[DB] ⚠️  كل اتصالات الـ Pool مشغولة")
                     return None
+                except Error as e:
+                    # اتصال واحد معطوب - محاولة ثانية بدلاً من إعادة بناء الـ Pool بالكامل
+                    logger.warning("[DB] ⚠️  الاتصال غير نشط، إعادة المحاولة... (%s)", e)
+                    return self._borrow_connection()
             else:
                 # إذا لم يكن هناك pool، حاول إعادة التهيئة
                 if self._error_count <= self._max_retries:
                     self._init_pool()
                     if self.pool:
-                        return self.pool.get_connection()
+                        return self._borrow_connection()
                 
                 return None
                 
         except Exception as e:
             self._error_count += 1
             
-            if "bytearray index out of range" in str(e):
-                print("[DB] ⚠️  خطأ bytearray، إعادة تهيئة الـ Pool...")
-                self._init_pool()
-            elif "MySQL Connection not available" in str(e):
-                print("[DB] ⚠️  اتصال MySQL غير متوفر، إعادة التهيئة...")
-                self._init_pool()
-            
             if self._error_count <= 3:
-                print(f"[DB] ❌ خطأ في الحصول على اتصال ({self._error_count}/3): {e}")
+                logger.error("[DB] ❌ خطأ في الحصول على اتصال (%s/3): %s", self._error_count, e)
             else:
-                print(f"[DB] ⚠️  تم تعطيل الاتصال بعد {self._error_count} أخطاء متتالية")
+                logger.warning("[DB] ⚠️  تم تعطيل الاتصال بعد %s أخطاء متتالية", self._error_count)
             
             return None
 
+    def _borrow_connection(self):
+        """استعارة اتصال من الـ Pool مع تجديد الاتصالات التي تجاوزت عمرها الأقصى"""
+        # الـ Pool نفسه يفحص الاتصال (COM_PING) ويعيد الاتصال إذا كان منقطعاً
+        deadline = time.monotonic() + POOL_WAIT_TIMEOUT
+        while True:
+            try:
+                conn = self.pool.get_connection()
+                break
+            except PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.01)
+        cnx = conn._cnx
+        now = time.monotonic()
+        
+        created_at = getattr(cnx, '_created_at', None)
+        if created_at is None:
+            cnx._created_at = now
+        elif now - created_at > MAX_CONNECTION_LIFETIME:
+            # تجديد الاتصال قبل أن يغلقه MySQL بسبب wait_timeout
+            try:
+                cnx.reconnect(attempts=2, delay=0)
+            except Error:
+                conn.close()
+                raise
+            cnx._created_at = now
+        
+        return conn
+
     def is_connected(self):
         """التحقق مما إذا كان الاتصال متاحًا"""
         try:
+            # get_connection يتحقق من الاتصال عبر COM_PING، فلا حاجة لاستعلام SELECT 1 إضافي
             conn = self.get_connection()
             if conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT 1")
-                cursor.fetchone()
-                cursor.close()
                 conn.close()
                 return True
             return False
         except:
             return False
 
-    def execute_select(self, query, params=None):
-        """تنفيذ استعلام SELECT - آمن ضد فشل الاتصال"""
-        conn = None
-        cursor = None
-        try:
+    @contextmanager
+    def cursor(self, dictionary=False, prepared=False, commit=False, conn=None):
+        """cursor على اتصال من الـ Pool يُغلقان تلقائياً، مع commit/rollback عند الكتابة
+        
+        إذا مُرّر conn فالمستدعي يملك الاتصال ومعاملته: لا commit ولا rollback ولا إغلاق للاتصال هنا
+        """
+        owns_conn = conn is None
+        if owns_conn:
             conn = self.get_connection()
             if not conn:
-                print(f"[DB] ⚠️  فشل في الحصول على اتصال لـ SELECT: {query[:50]}...")
-                return None
-            
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query, params or ())
-            result = cursor.fetchall()
-            
-            return result
-            
-        except Error as e:
-            print(f"[DB] ❌ خطأ في SELECT: {e}")
-            print(f"[DB]   الاستعلام: {query[:100]}")
-            
-            # التحقق من الأخطاء الشائعة
-            error_msg = str(e)
-            if "bytearray index out of range" in error_msg:
-                print("[DB] ⚠️  خطأ bytearray - إعادة تهيئة الاتصال")
-                self._init_pool()
-            elif "MySQL Connection not available" in error_msg:
-                print("[DB] ⚠️  اتصال MySQL غير متوفر")
-                self._init_pool()
-            
-            return None
-            
-        except Exception as e:
-            print(f"[DB] ❌ خطأ غير متوقع في SELECT: {e}")
-            return None
-            
+                raise DatabaseUnavailableError()
+        
+        commit = commit and owns_conn
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=dictionary, prepared=prepared)
+            yield cursor
+            if commit:
+                conn.commit()
+        except Exception:
+            if commit:
+                try:
+                    conn.rollback()
+                except:
+                    pass
+            raise
         finally:
             # إغلاق الموارد بأمان
             try:
                 if cursor:
                     cursor.close()
-                if conn:
+                if owns_conn:
                     conn.close()
             except:
                 pass
 
-    def execute_write(self, query, params=None):
-        """تنفيذ استعلام INSERT/UPDATE/DELETE - آمن ضد فشل الاتصال"""
-        conn = None
-        cursor = None
+    def execute_select(self, query, params=None, conn=None):
+        """تنفيذ استعلام SELECT - آمن ضد فشل الاتصال"""
         try:
-            conn = self.get_connection()
-            if not conn:
-                print(f"[DB] ⚠️  فشل في الحصول على اتصال لـ WRITE: {query[:50]}...")
-                return None
-            
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            conn.commit()
-            affected = cursor.rowcount
+            with self.cursor(dictionary=True, conn=conn) as cursor:
+                cursor.execute(query, params or ())
+                return cursor.fetchall()
             
-            return affected
+        except DatabaseUnavailableError:
+            logger.warning("[DB] ⚠️  فشل في الحصول على اتصال لـ SELECT: %s", _statement_label(query))
+            return None
             
         except Error as e:
-            print(f"[DB] ❌ خطأ في WRITE: {e}")
-            print(f"[DB]   الاستعلام: {query[:100]}")
+            logger.error("[DB] ❌ خطأ في SELECT: %s", e)
+            logger.error("[DB]   الاستعلام: %s", _statement_label(query))
+            return None
             
-            if conn:
-                try:
-                    conn.rollback()
-                except:
-                    pass
+        except Exception as e:
+            logger.error("[DB] ❌ خطأ غير متوقع في SELECT: %s", e, exc_info=True)
+            return None
+
+    def execute_write(self, query, params=None, conn=None):
+        """تنفيذ استعلام INSERT/UPDATE/DELETE - آمن ضد فشل الاتصال"""
+        try:
+            with self.cursor(commit=True, conn=conn) as cursor:
+                cursor.execute(query, params or ())
+                return cursor.rowcount
             
-            # التحقق من الأخطاء الشائعة
-            error_msg = str(e)
-            if "bytearray index out of range" in error_msg:
-                print("[DB] ⚠️  خطأ bytearray - إعادة تهيئة الاتصال")
-                self._init_pool()
-            elif "MySQL Connection not available" in error_msg:
-                print("[DB] ⚠️  اتصال MySQL غير متوفر")
-                self._init_pool()
+        except DatabaseUnavailableError:
+            logger.warning("[DB] ⚠️  فشل في الحصول على اتصال لـ WRITE: %s", _statement_label(query))
+            return None
             
+        except Error as e:
+            logger.error("[DB] ❌ خطأ في WRITE: %s", e)
+            logger.error("[DB]   الاستعلام: %s", _statement_label(query))
             return None
             
         except Exception as e:
-            print(f"[DB] ❌ خطأ غير متوقع في WRITE: {e}")
+            logger.error("[DB] ❌ خطأ غير متوقع في WRITE: %s", e, exc_info=True)
+            return None
+
+    def execute_many(self, query, seq_params, conn=None):
+        """تنفيذ نفس استعلام INSERT/UPDATE لعدة صفوف دفعة واحدة - آمن ضد فشل الاتصال"""
+        try:
+            with self.cursor(commit=True, conn=conn) as cursor:
+                cursor.executemany(query, seq_params)
+                return cursor.rowcount
             
-            if conn:
-                try:
-                    conn.rollback()
-                except:
-                    pass
+        except DatabaseUnavailableError:
+            logger.warning("[DB] ⚠️  فشل في الحصول على اتصال لـ WRITE MANY: %s", _statement_label(query))
+            return None
             
+        except Error as e:
+            logger.error("[DB] ❌ خطأ في WRITE MANY: %s", e)
+            logger.error("[DB]   الاستعلام: %s", _statement_label(query))
             return None
             
-        finally:
-            # إغلاق الموارد بأمان
+        except Exception as e:
+            logger.error("[DB] ❌ خطأ غير متوقع في WRITE MANY: %s", e, exc_info=True)
+            return None
+
+    def select_batches(self, query, params=None, batch_size=100):
+        """SELECT بـ cursor غير مخزّن: مولّد يعيد الصفوف على دفعات بدلاً من تحميل النتيجة كاملة في الذاكرة
+        
+        الاتصال يبقى مستعاراً حتى ينتهي المولّد أو يُغلق؛ يرفع DatabaseUnavailableError أو Error عند الفشل
+        """
+        with self.cursor(dictionary=True) as cursor:
+            cursor.execute(query, params or ())
             try:
-                if cursor:
-                    cursor.close()
-                if conn:
-                    conn.close()
-            except:
-                pass
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            except GeneratorExit:
+                # توقف القارئ قبل نهاية النتيجة: قراءة الباقي حتى يعود الاتصال للـ Pool بدون نتيجة معلّقة
+                try:
+                    cursor.fetchall()
+                except Error:
+                    pass
+                raise
 
-    def create_tables(self):
+    def create_tables(self, conn=None):
         """إنشاء الجداول اللازمة - تعمل حتى مع فشل الاتصال"""
-        print("[DB] محاولة إنشاء/تحديث الجداول...")
-        
-        queries = [
-            """
-            CREATE TABLE IF NOT EXISTS projects (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                title VARCHAR(255) NOT NULL,
-                category VARCHAR(100) DEFAULT 'website',
-                description TEXT NOT NULL,
-                technologies TEXT,
-                client VARCHAR(255),
-                project_date DATE,
-                project_url VARCHAR(500),
-                image_url VARCHAR(500),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT TRUE,
-                INDEX idx_active (is_active),
-                INDEX idx_created (created_at)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS project_requests (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                name VARCHAR(255) NOT NULL,
-                email VARCHAR(255) NOT NULL,
-                project_type VARCHAR(100) DEFAULT 'website',
-                description TEXT NOT NULL,
-                status VARCHAR(50) DEFAULT 'new',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                INDEX idx_status (status),
-                INDEX idx_created (created_at)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS admin_users (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(100) UNIQUE NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                full_name VARCHAR(255),
-                email VARCHAR(255),
-                role VARCHAR(50) DEFAULT 'admin',
-                last_login TIMESTAMP NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT TRUE,
-                INDEX idx_username (username),
-                INDEX idx_active (is_active)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS settings (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                setting_key VARCHAR(100) UNIQUE NOT NULL,
-                setting_value TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                INDEX idx_key (setting_key)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE utf8mb4_unicode_ci
-            """
-        ]
+        logger.info("[DB] محاولة إنشاء/تحديث الجداول...")
+        
+        queries = _Q_CREATE_TABLES
         
         try:
             success_count = 0
             fail_count = 0
             
-            for i, query in enumerate(queries):
-                result = self.execute_write(query)
+            # الجداول مستقلة (بدون مفاتيح أجنبية)، لذا تُنشأ بالتوازي كلٌّ على اتصال من الـ Pool
+            # (مع ترك اتصال واحد لـ setup_database)
+            if self.pool_size > len(queries):
+                with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+                    results = list(executor.map(self.execute_write, queries))
+            else:
+                # Pool صغير: بالتتابع على اتصال المستدعي حتى لا تنتظر كل جملة اتصالاً لن يتحرر
+                results = [self.execute_write(query, conn=conn) for query in queries]
+            
+            for i, result in enumerate(results):
                 if result is not None:
                     success_count += 1
                 else:
                     fail_count += 1
-                    print(f"[DB] ⚠️  فشل في إنشاء جدول {i+1}")
+                    logger.warning("[DB] ⚠️  فشل في إنشاء جدول %s", i+1)
             
             if success_count > 0:
-                print(f"[DB] ✅ تم إنشاء/تحديث {success_count} من {len(queries)} جداول")
+                logger.info("[DB] ✅ تم إنشاء/تحديث %s من %s جداول", success_count, len(queries))
             if fail_count > 0:
-                print(f"[DB] ⚠️  فشل في إنشاء {fail_count} جداول")
+                logger.warning("[DB] ⚠️  فشل في إنشاء %s جداول", fail_count)
                 
             return success_count > 0
         except Exception as e:
-            print(f"[DB] ❌ خطأ في إنشاء الجداول: {e}")
+            logger.error("[DB] ❌ خطأ في إنشاء الجداول: %s", e)
             return False
 
-    def fix_database_issues(self):
+    def fix_database_issues(self, conn=None):
         """إصلاح مشاكل قاعدة البيانات - تعمل حتى مع فشل الاتصال"""
-        print("[DB] فحص وإصلاح مشاكل قاعدة البيانات...")
+        logger.info("[DB] فحص وإصلاح مشاكل قاعدة البيانات...")
         
-        if not self.is_connected():
-            print("[DB] ⚠️  لا يمكن إصلاح قاعدة البيانات - الاتصال غير متوفر")
-            return False
+        # اتصال واحد لكل عمليات الفحص والإصلاح (يُستعار هنا إذا لم يمرّره المستدعي)
+        owns_conn = conn is None
+        if owns_conn:
+            conn = self.get_connection()
+            if not conn:
+                logger.warning("[DB] ⚠️  لا يمكن إصلاح قاعدة البيانات - الاتصال غير متوفر")
+                return False
         
         try:
-            # التحقق من الجداول الأساسية
-            tables_to_check = ['admin_users', 'settings', 'projects', 'project_requests']
-            for table in tables_to_check:
-                query = """
-                SELECT TABLE_NAME 
-                FROM INFORMATION_SCHEMA.TABLES 
-                WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
-                """
-                tables = self.execute_select(query, (self.database, table))
-                
-                if not tables:
-                    print(f"[DB] ⚠️  جدول {table} غير موجود")
+            # التحقق من الجداول الأساسية باستعلام واحد
+            tables = self.execute_select(_Q_CHECK_TABLES, (self.database, *_TABLE_NAMES), conn=conn)
+            if tables is not None:
+                existing_tables = {row['TABLE_NAME'] for row in tables}
+                for table in _TABLE_NAMES:
+                    if table not in existing_tables:
+                        logger.warning("[DB] ⚠️  جدول %s غير موجود", table)
             
-            # التحقق من مستخدم admin
-            query = "SELECT id, username, password_hash FROM admin_users WHERE username = 'admin'"
-            admin_user = self.execute_select(query)
-            
-            if not admin_user:
-                print("[DB] ⚠️  مستخدم admin غير موجود، جاري إنشائه...")
-                
-                # كلمة مرور آمنة
-                password = "admin123"
-                password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-                
-                query = """
-                INSERT INTO admin_users (username, password_hash, full_name, email, role, is_active)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
-                result = self.execute_write(query, (
-                    'admin',
-                    password_hash.decode('utf-8'),
-                    'المسؤول الرئيسي',
-                    'admin@hawkstudio.com',
-                    'admin',
-                    True
-                ))
-                
-                if result:
-                    print("[DB] ✅ تم إضافة مستخدم admin")
-                else:
-                    print("[DB] ⚠️  فشل في إضافة مستخدم admin")
+            # كلمة مرور آمنة (تُحسب قبل فتح المعاملة حتى لا تبقى مفتوحة أثناء bcrypt)
+            password = "admin123"
+            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
             
             # التحقق من الإعدادات الأساسية
             basic_settings = [
@@ -410,64 +681,205 @@ class Database:
                 ('maintenance_message', 'نحن نقوم بإجراء بعض التحسينات على الموقع وسنعود قريباً.')
             ]
             
-            for key, value in basic_settings:
-                query = "SELECT setting_value FROM settings WHERE setting_key = %s"
-                setting_exists = self.execute_select(query, (key,))
-                
-                if not setting_exists:
-                    query = "INSERT INTO settings (setting_key, setting_value) VALUES (%s, %s)"
-                    result = self.execute_write(query, (key, value))
-                    if result:
-                        print(f"[DB] ✅ تم إضافة إعداد {key}")
+            # البيانات الأساسية داخل معاملة واحدة حتى لا يبقى نصفها عند الفشل
+            conn.start_transaction()
+            
+            # إنشاء مستخدم admin إذا لم يكن موجوداً (استعلام واحد ذري بدلاً من SELECT ثم INSERT)
+            admin_result = self.execute_write(_Q_SEED_ADMIN, (
+                'admin',
+                password_hash.decode('utf-8'),
+                'المسؤول الرئيسي',
+                'admin@hawkstudio.com',
+                'admin',
+                True
+            ), conn=conn)
+            
+            # إضافة الإعدادات الناقصة فقط باستعلام واحد متعدد الصفوف (القيم الموجودة لا تتغير)
+            settings_result = self.execute_many(_Q_SEED_SETTING, basic_settings, conn=conn)
+            
+            if admin_result is None or settings_result is None:
+                conn.rollback()
+                logger.warning("[DB] ⚠️  فشل في إضافة البيانات الأساسية - تم التراجع عن المعاملة")
+                return False
+            
+            conn.commit()
+            
+            if admin_result > 0:
+                logger.info("[DB] ✅ تم إضافة مستخدم admin")
+            if settings_result > 0:
+                logger.info("[DB] ✅ تم إضافة %s إعدادات", settings_result)
+            
+            invalidate_settings_cache()
             
-            print("[DB] ✅ تم فحص وإصلاح قاعدة البيانات")
+            logger.info("[DB] ✅ تم فحص وإصلاح قاعدة البيانات")
             return True
             
         except Exception as e:
-            print(f"[DB] ❌ خطأ في إصلاح قاعدة البيانات: {e}")
+            logger.error("[DB] ❌ خطأ في إصلاح قاعدة البيانات: %s", e)
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except:
+                pass
             return False
+            
+        finally:
+            if owns_conn:
+                try:
+                    conn.close()
+                except:
+                    pass
 
     def setup_database(self):
         """إعداد قاعدة البيانات بالكامل - لا توقف التطبيق عند الفشل"""
-        print("[DB] بدء إعداد قاعدة البيانات...")
+        logger.info("[DB] بدء إعداد قاعدة البيانات...")
         
         try:
-            # 1. اختبار الاتصال أولاً
-            print("[DB] 🔗 اختبار الاتصال بقاعدة البيانات...")
-            if not self.is_connected():
-                print("[DB] ⚠️  فشل اختبار الاتصال - سيتم تشغيل التطبيق بدون قاعدة بيانات")
+            # 1. اختبار الاتصال أولاً - نفس الاتصال يُستخدم لبقية الإعداد
+            logger.info("[DB] 🔗 اختبار الاتصال بقاعدة البيانات...")
+            conn = self.get_connection()
+            if not conn:
+                logger.warning("[DB] ⚠️  فشل اختبار الاتصال - سيتم تشغيل التطبيق بدون قاعدة بيانات")
                 return False
             
-            print("[DB] ✅ تم الاتصال بقاعدة البيانات بنجاح")
+            logger.info("[DB] ✅ تم الاتصال بقاعدة البيانات بنجاح")
             
-            # 2. إنشاء الجداول
-            print("[DB] 📊 إنشاء الجداول...")
-            self.create_tables()
-            
-            # 3. إصلاح أي مشاكل
-            print("[DB] 🔧 إصلاح مشاكل قاعدة البيانات...")
-            self.fix_database_issues()
+            try:
+                # 2. إنشاء الجداول (بالتوازي على اتصالات منفصلة، أو بالتتابع على نفس الاتصال إذا كان الـ Pool صغيراً)
+                logger.info("[DB] 📊 إنشاء الجداول...")
+                self.create_tables(conn=conn)
+                
+                # 3. إصلاح أي مشاكل
+                logger.info("[DB] 🔧 إصلاح مشاكل قاعدة البيانات...")
+                self.fix_database_issues(conn=conn)
+            finally:
+                conn.close()
             
-            print("[DB] 🎉 تم إعداد قاعدة البيانات بنجاح!")
+            logger.info("[DB] 🎉 تم إعداد قاعدة البيانات بنجاح!")
             return True
             
         except Exception as e:
-            print(f"[DB] ❌ خطأ غير متوقع في إعداد قاعدة البيانات: {e}")
-            print("[DB] ⚠️  سيتم تشغيل التطبيق بدون قاعدة بيانات")
+            logger.error("[DB] ❌ خطأ غير متوقع في إعداد قاعدة البيانات: %s", e, exc_info=True)
+            logger.warning("[DB] ⚠️  سيتم تشغيل التطبيق بدون قاعدة بيانات")
             return False
 
+    def setup_database_async(self):
+        """تشغيل إعداد قاعدة البيانات في خيط خلفي حتى لا يتأخر بدء السيرفر"""
+        self._schema_ready.clear()
+        
+        def run():
+            try:
+                self.setup_database()
+            finally:
+                self._schema_ready.set()
+        
+        thread = threading.Thread(target=run, name='db-setup', daemon=True)
+        thread.start()
+        return thread
+
+    def wait_for_schema(self, timeout=5):
+        """انتظار انتهاء الإعداد الخلفي (إن وُجد) قبل الكتابة على الجداول"""
+        return self._schema_ready.wait(timeout=timeout)
+
 # إنشاء كائن قاعدة بيانات عالمي (بدون اتصال مباشر)
 db = Database()
 
+# ============================================================================
+# كاش الإعدادات (داخل العملية)
+# ============================================================================
+
+# الأخطاء المتوقعة عند قراءة الإعدادات (بدلاً من except عام يخفي الأخطاء الحقيقية)
+_DB_EXC = (Error, IndexError, KeyError, TypeError)
+
+SETTINGS_CACHE_TTL = 30  # ثانية
+
+_settings_cache = {}
+_settings_cache_expiry = 0.0
+_settings_cache_lock = threading.Lock()
+
+def invalidate_settings_cache():
+    """إبطال كاش الإعدادات بعد أي كتابة على جدول settings"""
+    global _settings_cache_expiry
+    _settings_cache_expiry = 0.0
+
+def _refresh_settings_cache():
+    """تحميل جميع الإعدادات باستعلام واحد عند انتهاء الصلاحية - False إذا كانت قاعدة البيانات غير متاحة"""
+    global _settings_cache, _settings_cache_expiry
+    
+    # خيط واحد فقط يعيد التحميل؛ البقية تنتظر ثم تستخدم النتيجة نفسها
+    with _settings_cache_lock:
+        if time.monotonic() < _settings_cache_expiry:
+            return True
+        
+        rows = db.execute_select(_Q_LIST_SETTINGS)
+        if rows is None:
+            # قاعدة البيانات غير متاحة - لا نخزن الفشل في الكاش
+            return False
+        
+        _settings_cache = {row['setting_key']: row['setting_value'] for row in rows}
+        _settings_cache_expiry = time.monotonic() + SETTINGS_CACHE_TTL
+        return True
+
+def get_settings():
+    """نسخة من جميع الإعدادات، أو None إذا كانت قاعدة البيانات غير متاحة"""
+    if time.monotonic() >= _settings_cache_expiry and not _refresh_settings_cache():
+        return None
+    return dict(_settings_cache)
+
+def get_setting(key, default=None):
+    """قراءة إعداد من الكاش (آخر قيمة معروفة إذا تعذر التحديث)"""
+    if time.monotonic() >= _settings_cache_expiry:
+        _refresh_settings_cache()
+    return _settings_cache.get(key) or default
+
 # ============================================================================
 # تطبيق Flask
 # ============================================================================
 
+# مدة تخزين الملفات الثابتة في متصفح العميل (صفحات HTML تُعاد مصادقتها دائماً عبر ETag)
+STATIC_MAX_AGE = 3600  # ثانية
+
+# الصور المرفوعة لا تتغير أبداً (اسم الملف بصمة محتواه)، فتُخزَّن لدى المتصفح والـ CDN لمدة سنة
+UPLOAD_MAX_AGE = 365 * 24 * 3600  # ثانية
+
+def _json_default(obj):
+    """Serialize the few types orjson does not handle natively"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode('utf-8')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_json(obj):
+    """Serialize to UTF-8 JSON bytes with orjson"""
+    return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (used by jsonify and request.get_json)"""
+    def dumps(self, obj, **kwargs):
+        return dumps_json(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_json(obj), mimetype='application/json')
+
+class HawkStudioFlask(Flask):
+    json_provider_class = OrjsonProvider
+
+    def get_send_file_max_age(self, filename):
+        """Cache static assets for STATIC_MAX_AGE, always revalidate HTML pages"""
+        if filename and filename.lower().endswith('.html'):
+            return None
+        return STATIC_MAX_AGE
+
 # Initialize Flask app
-app = Flask(__name__, static_folder='.', static_url_path='')
+app = HawkStudioFlask(__name__, static_folder='.', static_url_path='')
 
 # إعدادات CORS الذكية
-if os.getenv("RENDER") == "true":
+if _IS_RENDER:
     # في بيئة Render، السماح بجميع الأصول
     CORS(app, resources={r"/*": {
         "origins": "*",
@@ -475,7 +887,7 @@ if os.getenv("RENDER") == "true":
         "allow_headers": ["Content-Type", "Authorization"],
         "supports_credentials": False
     }})
-    print("[APP] تم تهيئة CORS لبيئة Render (جميع الأصول مسموحة)")
+    logger.info("[APP] تم تهيئة CORS لبيئة Render (جميع الأصول مسموحة)")
 else:
     # في البيئة المحلية، استخدام أصول محددة
     CORS(app, resources={r"/*": {
@@ -484,35 +896,151 @@ else:
         "allow_headers": ["Content-Type", "Authorization"],
         "supports_credentials": True
     }})
-    print("[APP] تم تهيئة CORS للبيئة المحلية")
-
-# إضافة headers للـ CORS يدويًا
-@app.after_request
-def after_request(response):
-    if os.getenv("RENDER") == "true":
-        response.headers.add('Access-Control-Allow-Origin', '*')
-    else:
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5000')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-    response.headers.add('Access-Control-Allow-Credentials', 'true')
-    return response
+    logger.info("[APP] تم تهيئة CORS للبيئة المحلية")
 
 # Configuration
 app.config['UPLOAD_FOLDER'] = 'uploads/projects'
 app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5MB max file size
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'hawkstudio-secret-key-2025')
 app.config['JWT_SECRET'] = os.getenv('JWT_SECRET', 'jwt-secret-key-hawkstudio-2025')
+# مفتاح HMAC كـ bytes مرة واحدة بدلاً من ترميز النص عند كل توقيع أو تحقق
+app.config['JWT_SECRET_BYTES'] = app.config['JWT_SECRET'].encode('utf-8')
+
+# عند التشغيل خلف nginx/Apache يمكن تفويض إرسال الملفات للـ proxy عبر X-Sendfile
+# (يفضّل أيضاً أن يخدم nginx المسارات /uploads/projects/ والملفات الثابتة مباشرة)
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE') == 'true'
+
+# كاش لنتائج القراءة العامة المتكررة: Redis عند توفر REDIS_URL (مشترك بين العمليات)، وإلا كاش داخل العملية
+PUBLIC_CACHE_TTL = 60  # ثانية
+_REDIS_URL = os.getenv('REDIS_URL')
+cache = Cache(app, config={
+    'CACHE_TYPE': 'RedisCache' if _REDIS_URL else 'SimpleCache',
+    'CACHE_REDIS_URL': _REDIS_URL,
+    'CACHE_DEFAULT_TIMEOUT': PUBLIC_CACHE_TTL,
+    'CACHE_KEY_PREFIX': 'hawk_'
+})
 
 # Allowed file extensions for images
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp'})
 
 # Create uploads directory if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return os.path.splitext(filename)[1][1:].lower() in ALLOWED_EXTENSIONS
+
+def is_image_content(blob):
+    """Check the file signature (magic bytes) of an uploaded image against the allowed formats"""
+    return (
+        blob.startswith(b'\x89PNG\r\n\x1a\n')
+        or blob.startswith(b'\xff\xd8\xff')
+        or blob.startswith((b'GIF87a', b'GIF89a'))
+        or (blob.startswith(b'RIFF') and blob[8:12] == b'WEBP')
+    )
+
+# كتابة الصور المرفوعة على القرص في خيوط خلفية حتى لا ينتظرها خيط الطلب
+upload_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='hawkstudio-upload')
+
+def _write_blob(filepath, blob):
+    """Write an uploaded file atomically (temp file + rename) so it is never served half-written"""
+    # اسم الملف بصمة محتواه: إذا كان موجوداً فهو نفس الصورة
+    if os.path.exists(filepath):
+        return
+    
+    # ملف مؤقت خاص بكل خيط حتى لا تتصادم كتابتان متزامنتان لنفس الصورة
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, filepath)
+    except OSError as e:
+        logger.error("[UPLOAD] ❌ فشل في حفظ الملف %s: %s", filepath, e)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+# أقصى انتظار لقفل ملف صورة مشترك
+IMAGE_LOCK_TIMEOUT = 5  # ثانية
+
+@contextmanager
+def image_reference_lock(image_url):
+    """Hold a MySQL named lock for a shared image file while its project references change
+    
+    Yields True while the lock is held, False if there is no image or the lock could not be taken.
+    """
+    conn = db.get_connection() if image_url else None
+    if not conn:
+        yield False
+        return
+    
+    # GET_LOCK مرتبط بالجلسة، فيُحرَّر على نفس الاتصال قبل إعادته للـ Pool
+    # MySQL يرفض أسماء الأقفال الأطول من 64 حرفاً (أسماء الملفات القديمة uuid_<الاسم الأصلي>)، فيُستخدم بصمة ثابتة الطول
+    filename = image_url.rsplit('/', 1)[-1]
+    lock_name = 'hawkstudio:image:' + hashlib.blake2b(filename.encode('utf-8'), digest_size=16).hexdigest()
+    acquired = False
+    try:
+        rows = db.execute_select(_Q_GET_NAMED_LOCK, (lock_name, IMAGE_LOCK_TIMEOUT), conn=conn)
+        acquired = bool(rows and rows[0]['acquired'])
+        yield acquired
+    finally:
+        if acquired:
+            db.execute_select(_Q_RELEASE_NAMED_LOCK, (lock_name,), conn=conn)
+        conn.close()
+
+# مدة صلاحية رمز تسجيل الدخول
+TOKEN_LIFETIME = 24 * 3600  # ثانية
+
+# كاش نتائج فك JWT لتجنب إعادة حساب HMAC-SHA256 لنفس الرمز في كل طلب
+TOKEN_CACHE_SIZE = 1024
+INVALID_TOKEN_CACHE_TTL = 30  # ثانية
+
+# المفتاح بصمة BLAKE2b بطول 16 بايت بدلاً من الرمز نفسه: حجم ثابت ولا تبقى الرموز الخام في الذاكرة
+_token_cache = {}  # بصمة الرمز -> (payload أو None للرموز غير الصالحة, وقت انتهاء الصلاحية)
+_token_cache_lock = threading.Lock()
+
+def _token_cache_key(token):
+    """Fixed-size cache key for a raw JWT"""
+    return hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+
+def _cache_token(key, payload, expires_at):
+    """Store a decode result, evicting the oldest entry when the cache is full"""
+    with _token_cache_lock:
+        if len(_token_cache) >= TOKEN_CACHE_SIZE:
+            _token_cache.pop(next(iter(_token_cache)))
+        _token_cache[key] = (payload, expires_at)
+
+def decode_token(token):
+    """Decode a JWT, reusing cached results; raises the same errors as jwt.decode"""
+    now = time.time()
+    key = _token_cache_key(token)
+    entry = _token_cache.get(key)
+    
+    if entry is not None:
+        payload, expires_at = entry
+        if now < expires_at:
+            if payload is None:
+                raise jwt.InvalidTokenError('Cached invalid token')
+            return payload
+        
+        with _token_cache_lock:
+            _token_cache.pop(key, None)
+        if payload is not None:
+            raise jwt.ExpiredSignatureError('Signature has expired')
+    
+    try:
+        payload = jwt.decode(token, app.config['JWT_SECRET_BYTES'], algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        raise
+    except jwt.InvalidTokenError:
+        _cache_token(key, None, now + INVALID_TOKEN_CACHE_TTL)
+        raise
+    
+    if 'exp' in payload:
+        _cache_token(key, payload, payload['exp'])
+    
+    return payload
 
 def token_required(f):
     """Decorator for protecting routes with JWT token"""
@@ -533,7 +1061,7 @@ def token_required(f):
         
         try:
             # Decode the token
-            data = jwt.decode(token, app.config['JWT_SECRET'], algorithms=['HS256'])
+            data = decode_token(token)
             request.current_user = data  # Store user data in request object
         except jwt.ExpiredSignatureError:
             return jsonify({
@@ -550,6 +1078,12 @@ def token_required(f):
     
     return decorated
 
+def db_up():
+    """db.is_connected() checked at most once per request (the result lives in flask.g)"""
+    if '_db_up' not in g:
+        g._db_up = db.is_connected()
+    return g._db_up
+
 def create_response(data=None, message='نجاح', status=200, success=True):
     """Create a standardized API response"""
     response = {
@@ -561,7 +1095,59 @@ def create_response(data=None, message='نجاح', status=200, success=True):
     if not success and status != 200:
         response['error'] = message
     
-    return jsonify(response), status
+    return app.response_class(dumps_json(response), status=status, mimetype='application/json')
+
+def stream_list_response(first_batch, batches, message):
+    """Stream a successful create_response-shaped list response batch by batch"""
+    def generate():
+        yield b'{"success":true,"message":' + dumps_json(message) + b',"data":['
+        separator = b''
+        try:
+            for batch in itertools.chain((first_batch,), batches):
+                if batch:
+                    yield separator + b','.join(dumps_json(row) for row in batch)
+                    separator = b','
+        except Exception as e:
+            # لا يمكن تغيير رمز الحالة بعد بدء الإرسال؛ JSON غير مكتمل يجعل العميل يعامل الرد كفشل
+            logger.error("[API] ❌ انقطع بث القائمة: %s", e)
+            return
+        yield b']}'
+    
+    return app.response_class(generate(), mimetype='application/json')
+
+# أقصى عدد صفوف في صفحة واحدة عند طلب ?limit=
+ADMIN_PAGE_MAX_LIMIT = 200
+
+def _list_page_query(template, args, conditions=(), params=()):
+    """Fill a list query template with optional keyset pagination (?limit=&before=&before_id=, newest first)
+
+    Raises ValueError on malformed pagination arguments.
+    """
+    conditions = list(conditions)
+    params = list(params)
+    
+    before = args.get('before')
+    before_id = args.get('before_id')
+    if before or before_id:
+        if not (before and before_id):
+            raise ValueError('before and before_id must be given together')
+        before = datetime.fromisoformat(before)
+        before_id = int(before_id)
+        # المؤشر هو (created_at, id) لآخر صف في الصفحة السابقة؛ الفهرس على created_at يتضمن id ضمنياً في InnoDB
+        conditions.append('(created_at < %s OR (created_at = %s AND id < %s))')
+        params += [before, before, before_id]
+    
+    limit_sql = ''
+    limit = args.get('limit')
+    if limit is not None:
+        limit = int(limit)
+        if not 1 <= limit <= ADMIN_PAGE_MAX_LIMIT:
+            raise ValueError(f'limit must be between 1 and {ADMIN_PAGE_MAX_LIMIT}')
+        limit_sql = 'LIMIT %s'
+        params.append(limit)
+    
+    where_sql = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+    return template.format(where=where_sql, limit=limit_sql), params
 
 # ============================================================================
 # Routes - Static Files
@@ -572,43 +1158,25 @@ def main_index():
     """Serve the main HTML file with maintenance mode check"""
     try:
         # محاولة الحصول على إعدادات وضع الصيانة
-        query = "SELECT setting_value FROM settings WHERE setting_key = 'maintenance_mode'"
-        result = db.execute_select(query)
-        
+        maintenance_mode = get_setting('maintenance_mode', 'disabled')
+    except _DB_EXC as e:
+        # في حالة خطأ في قاعدة البيانات، عرض الصفحة الرئيسية بشكل طبيعي
+        logger.debug("main_index: maintenance_mode lookup failed: %s", e)
         maintenance_mode = 'disabled'
-        if result and result[0]:
-            maintenance_mode = result[0]['setting_value'] or 'disabled'
-        
-        # إذا كان وضع الصيانة مفعلاً، عرض صفحة الصيانة
-        if maintenance_mode == 'enabled':
-            return redirect('/maintenance')
-        
-        return send_from_directory('.', 'hawkstudio.html')
-    except:
-        # في حالة أي خطأ، عرض الصفحة الرئيسية بشكل طبيعي
-        return send_from_directory('.', 'hawkstudio.html')
+    
+    # إذا كان وضع الصيانة مفعلاً، عرض صفحة الصيانة
+    if maintenance_mode == 'enabled':
+        return redirect('/maintenance')
+    
+    return send_from_directory('.', 'hawkstudio.html')
 
 @app.route('/admin')
 def admin_page():
     """Serve the admin HTML file"""
     return send_from_directory('.', 'admin.html')
 
-@app.route('/maintenance')
-def maintenance_page():
-    """Maintenance mode page"""
-    maintenance_message = 'نحن نقوم بإجراء بعض التحسينات على الموقع وسنعود قريباً.'
-    
-    try:
-        # محاولة الحصول على رسالة الصيانة من قاعدة البيانات
-        query = "SELECT setting_value FROM settings WHERE setting_key = 'maintenance_message'"
-        result = db.execute_select(query)
-        
-        if result and result[0]:
-            maintenance_message = result[0]['setting_value'] or maintenance_message
-    except:
-        pass  # إذا فشل الاتصال، استخدام الرسالة الافتراضية
-    
-    return f'''
+# قالب صفحة الصيانة مُرمّز مسبقاً إلى bytes (الجزء قبل الرسالة وبعدها)
+_MAINTENANCE_TEMPLATE = '''
     <!DOCTYPE html>
     <html lang="ar" dir="rtl">
     <head>
@@ -618,7 +1186,7 @@ def maintenance_page():
         <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
         <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&display=swap" rel="stylesheet">
         <style>
-            body {{
+            body {
                 background: #050807;
                 color: #eafff4;
                 font-family: 'Inter', sans-serif;
@@ -629,15 +1197,15 @@ def maintenance_page():
                 align-items: center;
                 min-height: 100vh;
                 text-align: center;
-            }}
-            .maintenance-container {{
+            }
+            .maintenance-container {
                 padding: 40px;
                 max-width: 600px;
                 border: 1px solid rgba(0, 255, 136, 0.18);
                 border-radius: 20px;
                 background: rgba(15, 30, 24, 0.78);
-            }}
-            .logo {{
+            }
+            .logo {
                 font-size: 2.5rem;
                 font-weight: 900;
                 color: #00ff88;
@@ -646,17 +1214,17 @@ def maintenance_page():
                 align-items: center;
                 justify-content: center;
                 gap: 10px;
-            }}
-            .icon {{
+            }
+            .icon {
                 font-size: 4rem;
                 color: #00ff88;
                 margin-bottom: 20px;
-            }}
-            h1 {{
+            }
+            h1 {
                 color: #00ff88;
                 margin-bottom: 20px;
-            }}
-            .message {{
+            }
+            .message {
                 font-size: 1.2rem;
                 color: #7fa89a;
                 margin: 20px 0;
@@ -664,20 +1232,20 @@ def maintenance_page():
                 padding: 20px;
                 background: rgba(0, 0, 0, 0.3);
                 border-radius: 10px;
-            }}
-            .contact {{
+            }
+            .contact {
                 margin-top: 30px;
                 color: #7fa89a;
                 font-size: 0.9rem;
-            }}
-            .contact a {{
+            }
+            .contact a {
                 color: #00ff88;
                 text-decoration: none;
-            }}
-            .contact a:hover {{
+            }
+            .contact a:hover {
                 text-decoration: underline;
-            }}
-            .btn {{
+            }
+            .btn {
                 display: inline-block;
                 margin-top: 20px;
                 padding: 12px 24px;
@@ -687,11 +1255,11 @@ def maintenance_page():
                 border-radius: 8px;
                 font-weight: 700;
                 transition: all 0.3s ease;
-            }}
-            .btn:hover {{
+            }
+            .btn:hover {
                 transform: translateY(-3px);
                 box-shadow: 0 10px 25px rgba(0, 255, 136, 0.3);
-            }}
+            }
         </style>
     </head>
     <body>
@@ -703,7 +1271,7 @@ def maintenance_page():
                 <i class="fas fa-tools"></i>
             </div>
             <h1>جاري الصيانة</h1>
-            <div class="message">{maintenance_message}</div>
+            <div class="message">__MAINTENANCE_MESSAGE__</div>
             <div class="contact">
                 <p>للتواصل:</p>
                 <p>
@@ -722,6 +1290,31 @@ def maintenance_page():
     </body>
     </html>
     '''
+_MAINT_PREFIX, _MAINT_SUFFIX = (part.encode('utf-8') for part in _MAINTENANCE_TEMPLATE.split('__MAINTENANCE_MESSAGE__'))
+
+# آخر رسالة صيانة تم عرضها مع الصفحة الناتجة عنها
+_maintenance_rendered = (None, b'')
+
+@app.route('/maintenance')
+def maintenance_page():
+    """Maintenance mode page"""
+    global _maintenance_rendered
+    maintenance_message = 'نحن نقوم بإجراء بعض التحسينات على الموقع وسنعود قريباً.'
+    
+    try:
+        # محاولة الحصول على رسالة الصيانة من قاعدة البيانات
+        maintenance_message = get_setting('maintenance_message', maintenance_message)
+    except _DB_EXC as e:
+        # إذا فشل الاتصال، استخدام الرسالة الافتراضية
+        logger.debug("maintenance_page: maintenance_message lookup failed: %s", e)
+    
+    # إعادة بناء الصفحة فقط عند تغيّر الرسالة
+    cached_message, rendered = _maintenance_rendered
+    if cached_message != maintenance_message:
+        rendered = _MAINT_PREFIX + maintenance_message.encode('utf-8') + _MAINT_SUFFIX
+        _maintenance_rendered = (maintenance_message, rendered)
+    
+    return Response(rendered, mimetype='text/html')
 
 @app.route('/<path:path>')
 def serve_static(path):
@@ -733,71 +1326,86 @@ def favicon():
     """Serve favicon to avoid 404 errors"""
     return send_from_directory('.', 'favicon.ico', mimetype='image/vnd.microsoft.icon')
 
+# في الإنتاج يُفضّل أن يخدم nginx/CDN الصور مباشرة ويبقى هذا المسار احتياطياً، مثلاً:
+#   location /uploads/projects/ { root /app; expires 1y; add_header Cache-Control "public, immutable"; access_log off; }
 @app.route('/uploads/projects/<filename>')
 def serve_project_image(filename):
     """Serve uploaded project images"""
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    response = send_from_directory(app.config['UPLOAD_FOLDER'], filename, max_age=UPLOAD_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 # ============================================================================
 # API Routes - Public
 # ============================================================================
 
+# memoize لا يخزّن None، فتعطل قاعدة البيانات لا يُحفظ في الكاش
+@cache.memoize()
+def load_active_projects():
+    """Active projects for the homepage, or None if the database is unavailable"""
+    # التواريخ تبقى كائنات date/datetime؛ orjson يحولها إلى ISO-8601 عند إنشاء الاستجابة
+    return db.execute_select(_Q_LIST_ACTIVE_PROJECTS)
+
+# بدون كاش مشترك (Redis): الإعدادات مخزنة داخل كل عملية، وملء كاش مشترك منها يعيد نشر نسخة قديمة
+# لكل العمّال بعد تحديث الإعدادات. نفس مصدر main_index، فتتفق / و /api/site-status داخل العامل الواحد
+def load_site_status():
+    """Site status payload from the in-process settings cache, or None if the database is unavailable"""
+    settings = get_settings()
+    
+    if settings is None:
+        return None
+    
+    maintenance_mode = settings.get('maintenance_mode') or 'disabled'
+    
+    # نجاح تحميل الإعدادات يعني أن قاعدة البيانات متصلة، فلا حاجة لفحص اتصال إضافي
+    return {
+        'maintenance_mode': maintenance_mode,
+        'site_title': 'HawkStudio',
+        'site_description': 'هندسة الويب بمنهجية البرمجيات أولاً',
+        'database_connected': True
+    }
+
 @app.route('/api/projects', methods=['GET'])
 def get_projects():
     """Get all active projects"""
     try:
-        query = """
-        SELECT * FROM projects 
-        WHERE is_active = TRUE 
-        ORDER BY created_at DESC
-        LIMIT 12
-        """
-        projects = db.execute_select(query)
+        projects = load_active_projects()
         
         if projects is None:
             # قاعدة البيانات غير متصلة، إرجاع بيانات وهمية أو فارغة
             return create_response([], 'لا توجد مشاريع حالياً', 200)
         
-        # Convert date objects to string
-        for project in projects:
-            for date_field in ['project_date', 'created_at', 'updated_at']:
-                if project.get(date_field) and hasattr(project[date_field], 'isoformat'):
-                    project[date_field] = project[date_field].isoformat()
-        
         return create_response(projects, 'تم جلب المشاريع بنجاح')
-    except Exception as e:
-        app.logger.error(f"Error in get_projects: {str(e)}")
+    except Exception:
+        logger.exception("Error in get_projects")
         return create_response([], 'لا توجد مشاريع حالياً', 200)
 
 @app.route('/api/site-status', methods=['GET'])
 def get_site_status():
     """Get current site status including maintenance mode"""
     try:
-        query = "SELECT setting_value FROM settings WHERE setting_key = 'maintenance_mode'"
-        result = db.execute_select(query)
-        
-        maintenance_mode = 'disabled'
-        if result and result[0]:
-            maintenance_mode = result[0]['setting_value'] or 'disabled'
+        status = load_site_status()
         
-        return create_response({
-            'maintenance_mode': maintenance_mode,
-            'site_title': 'HawkStudio',
-            'site_description': 'هندسة الويب بمنهجية البرمجيات أولاً',
-            'database_connected': db.is_connected()
-        }, 'تم جلب حالة الموقع بنجاح')
+        if status is not None:
+            return create_response(status, 'تم جلب حالة الموقع بنجاح')
     except:
-        return create_response({
-            'maintenance_mode': 'disabled',
-            'site_title': 'HawkStudio',
-            'site_description': 'هندسة الويب بمنهجية البرمجيات أولاً',
-            'database_connected': False
-        }, 'تم جلب حالة الموقع بنجاح')
+        pass
+    
+    return create_response({
+        'maintenance_mode': 'disabled',
+        'site_title': 'HawkStudio',
+        'site_description': 'هندسة الويب بمنهجية البرمجيات أولاً',
+        'database_connected': False
+    }, 'تم جلب حالة الموقع بنجاح')
 
 @app.route('/api/project-request', methods=['POST'])
 def create_project_request():
     """Create a new project request from website form"""
     try:
+        # انتظار إنشاء الجداول إذا كان الإعداد ما زال جارياً
+        db.wait_for_schema()
+        
         data = request.get_json(silent=True) or {}
         
         # Validate required fields
@@ -807,11 +1415,6 @@ def create_project_request():
                 return create_response(None, f'حقل {field} مطلوب', 400, False)
         
         # Create project request
-        query = """
-        INSERT INTO project_requests (name, email, project_type, description)
-        VALUES (%s, %s, %s, %s)
-        """
-        
         params = (
             data.get('name'),
             data.get('email'),
@@ -819,34 +1422,36 @@ def create_project_request():
             data.get('description')
         )
         
-        result = db.execute_write(query, params)
+        result = db.execute_write(_Q_INSERT_PROJECT_REQUEST, params)
         
         if result is None:
             return create_response(None, 'فشل في حفظ الطلب - قاعدة البيانات غير متاحة', 503, False)
         
+        cache.delete_memoized(load_admin_stats)
+        
         return create_response(None, 'تم استلام طلبك بنجاح', 201)
         
-    except Exception as e:
-        app.logger.error(f"Error in create_project_request: {str(e)}")
+    except Exception:
+        logger.exception("Error in create_project_request")
         return create_response(None, 'فشل في حفظ الطلب', 503, False)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     try:
-        db_status = 'connected' if db.is_connected() else 'disconnected'
+        db_status = 'connected' if db_up() else 'disconnected'
         return create_response({
             'status': 'healthy',
             'timestamp': datetime.now().isoformat(),
             'database': db_status,
             'server': 'running',
             'port': 5000,
-            'environment': 'production' if os.getenv("RENDER") == "true" else 'development'
+            'environment': 'production' if _IS_RENDER else 'development'
         }, 'النظام يعمل بشكل طبيعي')
-    except Exception as e:
+    except Exception:
+        logger.exception("Error in health_check")
         return create_response({
             'status': 'partially_healthy',
-            'error': str(e),
             'server': 'running'
         }, 'النظام يعمل مع بعض المشاكل', 200, True)
 
@@ -867,94 +1472,99 @@ def admin_login():
             return create_response(None, 'اسم المستخدم وكلمة المرور مطلوبان', 400, False)
         
         # التحقق من اتصال قاعدة البيانات
-        if not db.is_connected():
+        if not db_up():
             return create_response(None, 'قاعدة البيانات غير متاحة حالياً', 503, False)
         
+        db.wait_for_schema()
+        
         # Get user from database
-        query = """
-        SELECT id, username, password_hash, full_name, email, role
-        FROM admin_users 
-        WHERE username = %s AND is_active = TRUE
-        LIMIT 1
-        """
-        users = db.execute_select(query, (username,))
+        users = db.execute_select(_Q_GET_ACTIVE_ADMIN, (username,))
         
-        if not users or len(users) == 0:
-            return create_response(None, 'اسم المستخدم أو كلمة المرور غير صحيحة', 401, False)
+        user = users[0] if users else None
+        stored_hash = (user.get('password_hash') or '') if user else ''
+        
+        # التحقق من كلمة المرور دائماً (مقابل DUMMY_HASH عند غياب المستخدم) ليبقى زمن الاستجابة ثابتاً
+        try:
+            valid = check_password(password.encode('utf-8'), stored_hash.encode('utf-8') if stored_hash else DUMMY_HASH)
+        except ValueError:
+            return create_response(None, 'خطأ في التحقق من كلمة المرور', 500, False)
         
-        user = users[0]
-        stored_hash = user.get('password_hash', '')
+        if not stored_hash or not valid:
+            return create_response(None, 'اسم المستخدم أو كلمة المرور غير صحيحة', 401, False)
         
-        # التحقق من كلمة المرور
-        if stored_hash:
+        # إعادة التجزئة بـ BCRYPT_ROUNDS عند اختلاف التكلفة (أعلى أو أقل) حتى تتساوى مع DUMMY_HASH،
+        # وإلا كشف فرق الزمن بين مستخدم موجود وغير موجود أسماء المستخدمين
+        if _hash_rounds(stored_hash) != BCRYPT_ROUNDS:
             try:
-                if bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
-                    # إنشاء JWT token
-                    token_payload = {
-                        'user_id': user['id'],
-                        'username': user['username'],
-                        'role': user['role'],
-                        'exp': datetime.utcnow() + timedelta(days=1)
-                    }
-                    
-                    token = jwt.encode(token_payload, app.config['JWT_SECRET'], algorithm='HS256')
-                    
-                    response_data = {
-                        'token': token,
-                        'user': {
-                            'id': user['id'],
-                            'username': user['username'],
-                            'full_name': user.get('full_name', ''),
-                            'email': user.get('email', ''),
-                            'role': user['role']
-                        }
-                    }
-                    
-                    return create_response(response_data, 'تم تسجيل الدخول بنجاح')
-                else:
-                    return create_response(None, 'اسم المستخدم أو كلمة المرور غير صحيحة', 401, False)
-            except:
-                return create_response(None, 'خطأ في التحقق من كلمة المرور', 500, False)
-        else:
-            return create_response(None, 'حساب المستخدم غير صالح', 401, False)
+                new_hash = hash_password(password.encode('utf-8')).decode('utf-8')
+                if db.execute_write(_Q_UPDATE_ADMIN_PASSWORD_HASH, (new_hash, user['id'])) is None:
+                    logger.warning("[AUTH] ⚠️  فشل تحديث تكلفة تجزئة كلمة مرور المستخدم %s", username)
+            except Exception:
+                logger.exception("[AUTH] ⚠️  فشل إعادة تجزئة كلمة مرور المستخدم %s", username)
+        
+        # إنشاء JWT token
+        token_payload = {
+            'user_id': user['id'],
+            'username': user['username'],
+            'role': user['role'],
+            'exp': int(time.time()) + TOKEN_LIFETIME
+        }
         
-    except Exception as e:
-        app.logger.error(f"Error in admin_login: {str(e)}")
-        return create_response(None, f'حدث خطأ في تسجيل الدخول', 500, False)
+        token = jwt.encode(token_payload, app.config['JWT_SECRET_BYTES'], algorithm='HS256')
+        
+        response_data = {
+            'token': token,
+            'user': {
+                'id': user['id'],
+                'username': user['username'],
+                'full_name': user.get('full_name', ''),
+                'email': user.get('email', ''),
+                'role': user['role']
+            }
+        }
+        
+        return create_response(response_data, 'تم تسجيل الدخول بنجاح')
+        
+    except Exception:
+        logger.exception("Error in admin_login")
+        return create_response(None, 'حدث خطأ في تسجيل الدخول', 500, False)
 
 @app.route('/api/admin/projects', methods=['GET'])
 @token_required
 def admin_get_projects():
     """Get all projects for admin (including inactive)"""
     try:
-        if not db.is_connected():
+        if not db_up():
             return create_response([], 'قاعدة البيانات غير متاحة', 503, False)
         
-        query = "SELECT * FROM projects ORDER BY created_at DESC"
-        projects = db.execute_select(query)
+        try:
+            query, params = _list_page_query(_Q_LIST_PROJECTS, request.args)
+        except ValueError:
+            return create_response([], 'معاملات الصفحة غير صالحة', 400, False)
         
-        if projects is None:
+        # بث الصفوف على دفعات بدلاً من تحميل الجدول كاملاً في الذاكرة
+        batches = db.select_batches(query, params)
+        try:
+            first_batch = next(batches, [])
+        except (DatabaseUnavailableError, Error) as e:
+            logger.warning("[DB] ⚠️  فشل في جلب المشاريع: %r", e)
             return create_response([], 'لا توجد مشاريع', 200)
         
-        # Convert date objects to string
-        for project in projects:
-            for date_field in ['project_date', 'created_at', 'updated_at']:
-                if project.get(date_field) and hasattr(project[date_field], 'isoformat'):
-                    project[date_field] = project[date_field].isoformat()
-        
-        return create_response(projects, 'تم جلب المشاريع بنجاح')
-    except Exception as e:
-        app.logger.error(f"Error in admin_get_projects: {str(e)}")
-        return create_response([], f'حدث خطأ', 500, False)
+        return stream_list_response(first_batch, batches, 'تم جلب المشاريع بنجاح')
+    except Exception:
+        logger.exception("Error in admin_get_projects")
+        return create_response([], 'حدث خطأ', 500, False)
 
 @app.route('/api/admin/projects', methods=['POST'])
 @token_required
 def admin_create_project():
     """Create a new project (admin only)"""
     try:
-        if not db.is_connected():
+        if not db_up():
             return create_response(None, 'قاعدة البيانات غير متاحة', 503, False)
         
+        db.wait_for_schema()
+        
         # Get form data
         title = request.form.get('title', '').strip()
         category = request.form.get('category', 'website').strip()
@@ -971,25 +1581,26 @@ def admin_create_project():
         
         # Handle image upload
         image_url = ''
+        blob = filepath = upload_future = None
         if 'image' in request.files:
             image_file = request.files['image']
             if image_file and image_file.filename != '' and allowed_file(image_file.filename):
-                # Generate unique filename
-                filename = secure_filename(image_file.filename)
-                unique_filename = f"{uuid.uuid4().hex}_{filename}"
+                # المحتوى مقروء في الذاكرة (حجمه محدود بـ MAX_CONTENT_LENGTH)؛ يُرفض قبل لمس القرص إن لم يكن صورة فعلاً
+                blob = image_file.read()
+                if not is_image_content(blob):
+                    return create_response(None, 'الملف المرفوع ليس صورة صالحة', 400, False)
+                
+                # Content-hash filename: الصور المتطابقة تشترك في ملف واحد وفي نفس مدخل كاش الـ CDN
+                extension = os.path.splitext(image_file.filename)[1].lower()
+                unique_filename = hashlib.blake2b(blob, digest_size=16).hexdigest() + extension
                 
                 # Save file
                 filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                image_file.save(filepath)
+                upload_future = upload_executor.submit(_write_blob, filepath, blob)
                 
                 image_url = f"/uploads/projects/{unique_filename}"
         
         # Insert project into database
-        query = """
-        INSERT INTO projects (title, category, description, technologies, client, project_date, project_url, image_url, is_active)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        
         params = (
             title,
             category,
@@ -1002,32 +1613,54 @@ def admin_create_project():
             is_active
         )
         
-        result = db.execute_write(query, params)
+        # الإدراج والتأكد من وجود الملف تحت قفل الصورة: حذف مشروع آخر بنفس الصورة لا يمكنه إزالة الملف بينهما
+        with image_reference_lock(image_url):
+            result = db.execute_write(_Q_INSERT_PROJECT, params)
+            
+            if result is not None and upload_future is not None:
+                # انتظار الكتابة في الخلفية، ثم إعادة إنشاء الملف إن حذفه حذفٌ سابق لمشروع يستخدم نفس الصورة
+                upload_future.result()
+                _write_blob(filepath, blob)
         
         if result is None:
             return create_response(None, 'فشل في إضافة المشروع', 500, False)
         
+        cache.delete_memoized(load_active_projects)
+        cache.delete_memoized(load_admin_stats)
+        
         return create_response(None, 'تم إضافة المشروع بنجاح', 201)
         
-    except Exception as e:
-        app.logger.error(f"Error in admin_create_project: {str(e)}")
-        return create_response(None, f'حدث خطأ', 500, False)
+    except Exception:
+        logger.exception("Error in admin_create_project")
+        return create_response(None, 'حدث خطأ', 500, False)
+
+def _column_changed(current, new):
+    """Whether a submitted value differs from the stored column value (DATE, TINYINT(1), NULL vs '')"""
+    # NULL في قاعدة البيانات وحقل فارغ في النموذج يعنيان نفس الشيء
+    if current is None:
+        return new != ''
+    if isinstance(new, bool):
+        return bool(current) != new
+    return str(current) != str(new)
 
 @app.route('/api/admin/projects/<int:project_id>', methods=['PUT'])
 @token_required
 def admin_update_project(project_id):
     """Update a project (admin only)"""
     try:
-        if not db.is_connected():
+        if not db_up():
             return create_response(None, 'قاعدة البيانات غير متاحة', 503, False)
         
-        # Check if project exists
-        query = "SELECT id FROM projects WHERE id = %s"
-        project = db.execute_select(query, (project_id,))
+        db.wait_for_schema()
+        
+        # Check if project exists (مع القيم الحالية لمقارنتها بالمدخلات)
+        project = db.execute_select(_Q_GET_PROJECT_EDITABLE, (project_id,))
         
         if not project:
             return create_response(None, 'المشروع غير موجود', 404, False)
         
+        current = project[0]
+        
         # Get form data from JSON
         data = request.get_json(silent=True) or request.form
         
@@ -1046,194 +1679,299 @@ def admin_update_project(project_id):
             ('is_active', data.get('is_active'))
         ]
         
+        has_values = False
         for field_name, field_value in fields_mapping:
             if field_value is not None:
-                update_fields.append(f"{field_name} = %s")
-                params.append(field_value)
+                has_values = True
+                # تحديث الحقول التي تغيرت فقط
+                if _column_changed(current[field_name], field_value):
+                    update_fields.append(f"{field_name} = %s")
+                    params.append(field_value)
         
-        if not update_fields:
+        if not has_values:
             return create_response(None, 'لا توجد بيانات للتحديث', 400, False)
         
+        if not update_fields:
+            # لا شيء تغير - لا كتابة على قاعدة البيانات ولا إبطال للكاش
+            return create_response(None, 'لا توجد تغييرات على المشروع')
+        
         # Add project_id to params
         params.append(project_id)
         
         # Execute update
-        query = f"UPDATE projects SET {', '.join(update_fields)} WHERE id = %s"
+        query = _Q_UPDATE_PROJECT.format(assignments=', '.join(update_fields))
         result = db.execute_write(query, params)
         
         if result is None:
             return create_response(None, 'فشل في تحديث المشروع', 500, False)
         
+        cache.delete_memoized(load_active_projects)
+        cache.delete_memoized(load_admin_stats)
+        
         return create_response(None, 'تم تحديث المشروع بنجاح')
         
-    except Exception as e:
-        app.logger.error(f"Error in admin_update_project: {str(e)}")
-        return create_response(None, f'حدث خطأ', 500, False)
+    except Exception:
+        logger.exception("Error in admin_update_project")
+        return create_response(None, 'حدث خطأ', 500, False)
 
 @app.route('/api/admin/projects/<int:project_id>', methods=['DELETE'])
 @token_required
 def admin_delete_project(project_id):
     """Delete a project (admin only)"""
     try:
-        if not db.is_connected():
+        if not db_up():
             return create_response(None, 'قاعدة البيانات غير متاحة', 503, False)
         
+        db.wait_for_schema()
+        
         # Get project info to delete image file
-        query = "SELECT image_url FROM projects WHERE id = %s"
-        project = db.execute_select(query, (project_id,))
+        project = db.execute_select(_Q_GET_PROJECT_IMAGE, (project_id,))
         
         if not project:
             return create_response(None, 'المشروع غير موجود', 404, False)
         
         project = project[0]
         
-        # Delete image file if exists
-        if project.get('image_url'):
-            image_filename = project['image_url'].split('/')[-1]
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], image_filename)
-            if os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except:
-                    pass  # Ignore file deletion errors
-        
-        # Delete project from database
-        query = "DELETE FROM projects WHERE id = %s"
-        result = db.execute_write(query, (project_id,))
-        
-        if result is None:
-            return create_response(None, 'فشل في حذف المشروع', 500, False)
+        # الحذف وفحص المراجع وإزالة الملف تحت نفس قفل الصورة الذي يأخذه إنشاء مشروع بنفس الصورة
+        with image_reference_lock(project.get('image_url')) as image_locked:
+            # Delete project from database
+            result = db.execute_write(_Q_DELETE_PROJECT, (project_id,))
+            
+            if result is None:
+                return create_response(None, 'فشل في حذف المشروع', 500, False)
+            
+            # Delete image file if exists (فقط إذا لم يعد أي مشروع آخر يستخدم نفس الصورة)
+            # بدون القفل يبقى الملف: ملف يتيم أهون من مشروع يشير إلى صورة محذوفة
+            if image_locked:
+                refs = db.execute_select(_Q_COUNT_IMAGE_REFERENCES, (project['image_url'],))
+                if refs and refs[0]['refs'] == 0:
+                    image_filename = project['image_url'].split('/')[-1]
+                    image_path = os.path.join(app.config['UPLOAD_FOLDER'], image_filename)
+                    if os.path.exists(image_path):
+                        try:
+                            os.remove(image_path)
+                        except:
+                            pass  # Ignore file deletion errors
+        
+        cache.delete_memoized(load_active_projects)
+        cache.delete_memoized(load_admin_stats)
         
         return create_response(None, 'تم حذف المشروع بنجاح')
         
-    except Exception as e:
-        app.logger.error(f"Error in admin_delete_project: {str(e)}")
-        return create_response(None, f'حدث خطأ', 500, False)
+    except Exception:
+        logger.exception("Error in admin_delete_project")
+        return create_response(None, 'حدث خطأ', 500, False)
+
+# حالات الطلب المعروفة (نفس القيم التي تعرضها لوحة التحكم)
+REQUEST_STATUSES = frozenset({'new', 'reviewing', 'contact', 'completed'})
+
+# أقصى عدد طلبات في تحديث جماعي واحد
+BULK_STATUS_MAX_IDS = 500
 
 @app.route('/api/admin/project-requests', methods=['GET'])
 @token_required
 def admin_get_project_requests():
     """Get all project requests (admin only)"""
     try:
-        if not db.is_connected():
+        if not db_up():
             return create_response([], 'قاعدة البيانات غير متاحة', 503, False)
         
-        query = "SELECT * FROM project_requests ORDER BY created_at DESC"
-        requests = db.execute_select(query)
+        # تصفية اختيارية حسب الحالة (يخدمها الفهرس status, created_at)
+        status = request.args.get('status')
+        if status is not None and status not in REQUEST_STATUSES:
+            return create_response([], 'حالة الطلب غير صالحة', 400, False)
         
-        if requests is None:
-            return create_response([], 'لا توجد طلبات', 200)
+        try:
+            query, params = _list_page_query(
+                _Q_LIST_PROJECT_REQUESTS, request.args,
+                conditions=['status = %s'] if status else (),
+                params=[status] if status else ()
+            )
+        except ValueError:
+            return create_response([], 'معاملات الصفحة غير صالحة', 400, False)
         
-        # Convert date objects to string
-        for req in requests:
-            for date_field in ['created_at', 'updated_at']:
-                if req.get(date_field) and hasattr(req[date_field], 'isoformat'):
-                    req[date_field] = req[date_field].isoformat()
+        batches = db.select_batches(query, params)
+        try:
+            first_batch = next(batches, [])
+        except (DatabaseUnavailableError, Error) as e:
+            logger.warning("[DB] ⚠️  فشل في جلب الطلبات: %r", e)
+            return create_response([], 'لا توجد طلبات', 200)
         
-        return create_response(requests, 'تم جلب الطلبات بنجاح')
-    except Exception as e:
-        app.logger.error(f"Error in admin_get_project_requests: {str(e)}")
-        return create_response([], f'حدث خطأ', 500, False)
+        return stream_list_response(first_batch, batches, 'تم جلب الطلبات بنجاح')
+    except Exception:
+        logger.exception("Error in admin_get_project_requests")
+        return create_response([], 'حدث خطأ', 500, False)
 
 @app.route('/api/admin/project-requests/<int:request_id>', methods=['GET'])
 @token_required
 def admin_get_project_request(request_id):
     """Get single project request details (admin only)"""
     try:
-        if not db.is_connected():
+        if not db_up():
             return create_response(None, 'قاعدة البيانات غير متاحة', 503, False)
         
-        query = "SELECT * FROM project_requests WHERE id = %s"
-        request_data = db.execute_select(query, (request_id,))
+        request_data = db.execute_select(_Q_GET_PROJECT_REQUEST, (request_id,))
         
         if not request_data:
             return create_response(None, 'الطلب غير موجود', 404, False)
         
-        request_data = request_data[0]
-        # Convert date objects to string
-        for date_field in ['created_at', 'updated_at']:
-            if request_data.get(date_field) and hasattr(request_data[date_field], 'isoformat'):
-                request_data[date_field] = request_data[date_field].isoformat()
-        
-        return create_response(request_data, 'تم جلب الطلب بنجاح')
-    except Exception as e:
-        app.logger.error(f"Error in admin_get_project_request: {str(e)}")
-        return create_response(None, f'حدث خطأ', 500, False)
+        return create_response(request_data[0], 'تم جلب الطلب بنجاح')
+    except Exception:
+        logger.exception("Error in admin_get_project_request")
+        return create_response(None, 'حدث خطأ', 500, False)
 
 @app.route('/api/admin/project-requests/<int:request_id>', methods=['PUT'])
 @token_required
 def admin_update_request_status(request_id):
     """Update project request status (admin only)"""
     try:
-        if not db.is_connected():
+        if not db_up():
             return create_response(None, 'قاعدة البيانات غير متاحة', 503, False)
         
+        db.wait_for_schema()
+        
         data = request.get_json(silent=True) or {}
         
         if not data.get('status'):
             return create_response(None, 'حالة الطلب مطلوبة', 400, False)
         
-        query = "UPDATE project_requests SET status = %s WHERE id = %s"
-        result = db.execute_write(query, (data['status'], request_id))
+        if not isinstance(data['status'], str) or data['status'] not in REQUEST_STATUSES:
+            return create_response(None, 'حالة الطلب غير صالحة', 400, False)
+        
+        result = db.execute_write(_Q_UPDATE_REQUEST_STATUS, (data['status'], request_id))
         
         if result is None:
             return create_response(None, 'فشل في تحديث حالة الطلب', 500, False)
         
+        cache.delete_memoized(load_admin_stats)
+        
         return create_response(None, 'تم تحديث حالة الطلب بنجاح')
         
-    except Exception as e:
-        app.logger.error(f"Error in admin_update_request_status: {str(e)}")
-        return create_response(None, f'حدث خطأ', 500, False)
+    except Exception:
+        logger.exception("Error in admin_update_request_status")
+        return create_response(None, 'حدث خطأ', 500, False)
+
+@app.route('/api/admin/project-requests/bulk-status', methods=['PUT'])
+@token_required
+def admin_bulk_update_request_status():
+    """Update the status of several project requests at once (admin only)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        status = data.get('status')
+        if not isinstance(status, str) or status not in REQUEST_STATUSES:
+            return create_response(None, 'حالة الطلب غير صالحة', 400, False)
+        
+        ids = data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return create_response(None, 'قائمة الطلبات مطلوبة', 400, False)
+        
+        # أعداد صحيحة فقط (أو نصوص أرقام): int() وحده يقبل true و 1.7 ويحولهما إلى 1
+        if not all(
+            (isinstance(request_id, int) and not isinstance(request_id, bool))
+            or (isinstance(request_id, str) and request_id.isascii() and request_id.isdigit())
+            for request_id in ids
+        ):
+            return create_response(None, 'معرفات الطلبات غير صالحة', 400, False)
+        
+        ids = sorted({int(request_id) for request_id in ids})
+        
+        if len(ids) > BULK_STATUS_MAX_IDS:
+            return create_response(None, f'الحد الأقصى {BULK_STATUS_MAX_IDS} طلب في المرة الواحدة', 400, False)
+        
+        if not db_up():
+            return create_response(None, 'قاعدة البيانات غير متاحة', 503, False)
+        
+        db.wait_for_schema()
+        
+        # استعلام واحد لكل الطلبات بدلاً من طلب HTTP واستعلام لكل طلب
+        query = _Q_BULK_UPDATE_REQUEST_STATUS.format(ids=', '.join(['%s'] * len(ids)))
+        result = db.execute_write(query, [status, *ids])
+        
+        if result is None:
+            return create_response(None, 'فشل في تحديث حالة الطلبات', 500, False)
+        
+        cache.delete_memoized(load_admin_stats)
+        
+        return create_response({'updated': result}, 'تم تحديث حالة الطلبات بنجاح')
+        
+    except Exception:
+        logger.exception("Error in admin_bulk_update_request_status")
+        return create_response(None, 'حدث خطأ', 500, False)
 
 @app.route('/api/admin/project-requests/<int:request_id>', methods=['DELETE'])
 @token_required
 def admin_delete_project_request(request_id):
     """Delete a project request (admin only)"""
     try:
-        if not db.is_connected():
+        if not db_up():
             return create_response(None, 'قاعدة البيانات غير متاحة', 503, False)
         
-        query = "DELETE FROM project_requests WHERE id = %s"
-        result = db.execute_write(query, (request_id,))
+        db.wait_for_schema()
+        
+        result = db.execute_write(_Q_DELETE_PROJECT_REQUEST, (request_id,))
         
         if result is None:
             return create_response(None, 'فشل في حذف الطلب', 500, False)
         
+        cache.delete_memoized(load_admin_stats)
+        
         return create_response(None, 'تم حذف الطلب بنجاح')
         
-    except Exception as e:
-        app.logger.error(f"Error in admin_delete_project_request: {str(e)}")
-        return create_response(None, f'حدث خطأ', 500, False)
+    except Exception:
+        logger.exception("Error in admin_delete_project_request")
+        return create_response(None, 'حدث خطأ', 500, False)
+
+# تُخزَّن الإحصائيات لفترة قصيرة، وكل تعديل على المشاريع أو الطلبات يمسح الكاش فوراً
+ADMIN_STATS_CACHE_TTL = 30  # ثانية
+
+@cache.memoize(timeout=ADMIN_STATS_CACHE_TTL)
+def load_admin_stats():
+    """Dashboard counters and recent activity, or None if the database is unavailable"""
+    conn = db.get_connection()
+    if not conn:
+        return None
+    
+    # الاستعلامات الثلاثة على نفس الاتصال
+    try:
+        counts = db.execute_select(_Q_GET_STATS, conn=conn)
+        recent_projects = db.execute_select(_Q_RECENT_PROJECTS, conn=conn)
+        recent_requests = db.execute_select(_Q_RECENT_PROJECT_REQUESTS, conn=conn)
+    finally:
+        conn.close()
+    
+    if not counts or recent_projects is None or recent_requests is None:
+        return None
+    
+    stats = dict(counts[0])
+    stats['recent_projects'] = recent_projects
+    stats['recent_requests'] = recent_requests
+    return stats
 
 @app.route('/api/admin/stats', methods=['GET'])
 @token_required
 def admin_get_stats():
     """Get website statistics (admin only)"""
     try:
-        if not db.is_connected():
-            return create_response({}, 'قاعدة البيانات غير متاحة', 503, False)
+        stats = load_admin_stats()
         
-        stats = {
-            'total_projects': 0,
-            'active_projects': 0,
-            'total_requests': 0,
-            'new_requests': 0,
-            'recent_projects': [],
-            'recent_requests': []
-        }
+        if stats is None:
+            return create_response({}, 'قاعدة البيانات غير متاحة', 503, False)
         
         return create_response(stats, 'تم جلب الإحصائيات بنجاح')
         
-    except Exception as e:
-        app.logger.error(f"Error in admin_get_stats: {str(e)}")
-        return create_response({}, f'حدث خطأ', 500, False)
+    except Exception:
+        logger.exception("Error in admin_get_stats")
+        return create_response({}, 'حدث خطأ', 500, False)
 
 @app.route('/api/admin/settings', methods=['GET'])
 @token_required
 def admin_get_settings():
     """Get website settings (admin only)"""
     try:
-        if not db.is_connected():
+        settings = get_settings()
+        
+        if settings is None:
             # إرجاع إعدادات افتراضية إذا كانت قاعدة البيانات غير متصلة
             settings = {
                 'site_title': 'HawkStudio',
@@ -1241,54 +1979,49 @@ def admin_get_settings():
                 'maintenance_mode': 'disabled',
                 'maintenance_message': 'نحن نقوم بإجراء بعض التحسينات على الموقع وسنعود قريباً.'
             }
-            return create_response(settings, 'تم جلب الإعدادات بنجاح')
-        
-        query = "SELECT setting_key, setting_value FROM settings"
-        settings_result = db.execute_select(query)
-        
-        settings = {}
-        if settings_result:
-            for item in settings_result:
-                settings[item['setting_key']] = item['setting_value']
         
         return create_response(settings, 'تم جلب الإعدادات بنجاح')
         
-    except Exception as e:
-        app.logger.error(f"Error in admin_get_settings: {str(e)}")
-        return create_response({}, f'حدث خطأ', 500, False)
+    except Exception:
+        logger.exception("Error in admin_get_settings")
+        return create_response({}, 'حدث خطأ', 500, False)
 
 @app.route('/api/admin/settings', methods=['POST'])
 @token_required
 def admin_update_settings():
     """Update website settings (admin only)"""
     try:
-        if not db.is_connected():
+        if not db_up():
             return create_response(None, 'قاعدة البيانات غير متاحة', 503, False)
         
+        db.wait_for_schema()
+        
         data = request.get_json(silent=True) or {}
         
         if not data:
             return create_response(None, 'لا توجد بيانات للإعدادات', 400, False)
         
-        for key, value in data.items():
-            query = """
-            INSERT INTO settings (setting_key, setting_value) 
-            VALUES (%s, %s) 
-            ON DUPLICATE KEY UPDATE setting_value = VALUES(setting_value)
-            """
-            db.execute_write(query, (key, value))
+        # كل الإعدادات في استعلام واحد (رحلة واحدة لقاعدة البيانات ومعاملة واحدة)
+        values = list(data.items())
+        query = _Q_UPSERT_SETTINGS.format(rows=', '.join(['(%s, %s)'] * len(values)))
+        params = [item for pair in values for item in pair]
+        
+        if db.execute_write(query, params) is None:
+            return create_response(None, 'فشل في تحديث الإعدادات', 500, False)
+        
+        invalidate_settings_cache()
         
         return create_response(None, 'تم تحديث الإعدادات بنجاح')
         
-    except Exception as e:
-        app.logger.error(f"Error in admin_update_settings: {str(e)}")
-        return create_response(None, f'حدث خطأ', 500, False)
+    except Exception:
+        logger.exception("Error in admin_update_settings")
+        return create_response(None, 'حدث خطأ', 500, False)
 
 @app.route('/api/admin/fix-database', methods=['POST'])
 def fix_database():
     """إصلاح قاعدة البيانات يدويًا"""
     try:
-        print("[API] 🔧 بدء إصلاح قاعدة البيانات...")
+        logger.info("[API] 🔧 بدء إصلاح قاعدة البيانات...")
         
         # إصلاح قاعدة البيانات
         if db.setup_database():
@@ -1296,9 +2029,9 @@ def fix_database():
         else:
             return create_response(None, 'فشل في إصلاح قاعدة البيانات', 500, False)
             
-    except Exception as e:
-        app.logger.error(f"Error fixing database: {str(e)}")
-        return create_response(None, f'حدث خطأ في إصلاح قاعدة البيانات: {str(e)}', 500, False)
+    except Exception:
+        logger.exception("Error fixing database")
+        return create_response(None, 'حدث خطأ في إصلاح قاعدة البيانات', 500, False)
 
 # ============================================================================
 # Error handlers
@@ -1316,35 +2049,56 @@ def internal_error(error):
 def request_entity_too_large(error):
     return create_response(None, 'حجم الملف كبير جداً (الحد الأقصى: 5MB)', 413, False)
 
+# رسائل عربية لأخطاء HTTP الشائعة (بدلاً من e.name الإنجليزي)
+HTTP_ERROR_MESSAGES = {
+    400: 'طلب غير صالح',
+    401: 'غير مصرح',
+    403: 'غير مسموح بالوصول',
+    404: 'الصفحة غير موجودة',
+    405: 'طريقة الطلب غير مسموحة',
+    413: 'حجم الملف كبير جداً (الحد الأقصى: 5MB)',
+    415: 'نوع المحتوى غير مدعوم',
+    429: 'طلبات كثيرة جداً، حاول لاحقاً',
+}
+
 @app.errorhandler(Exception)
 def handle_exception(e):
     """Handle all unhandled exceptions"""
-    app.logger.error(f"Unhandled exception: {str(e)}")
-    return create_response(None, f'حدث خطأ غير متوقع: {str(e)}', 500, False)
+    # أخطاء HTTP (405 وغيرها) تحتفظ برمزها بدلاً من تحويلها إلى 500
+    if isinstance(e, HTTPException):
+        return create_response(None, HTTP_ERROR_MESSAGES.get(e.code, 'تعذر تنفيذ الطلب'), e.code, False)
+    
+    # رسالة ثابتة للعميل (بدون تفاصيل داخلية)، والتفاصيل الكاملة مع الـ traceback في السجل
+    logger.exception("Unhandled exception")
+    return create_response(None, 'حدث خطأ غير متوقع', 500, False)
 
 # ============================================================================
 # Main Entry Point
 # ============================================================================
 
 if __name__ == '__main__':
+    # خادم Werkzeug للتطوير المحلي فقط؛ على Render يُستبدل العملية بـ Gunicorn (نفس أمر Procfile)
+    if _IS_RENDER:
+        os.execvp('gunicorn', ['gunicorn', 'wsgi:app'])
+    
     port = int(os.getenv("PORT", 5000))
     print("=" * 60)
     print("🚀 HawkStudio Server - Production Ready")
     print("=" * 60)
     
     # عرض معلومات البيئة
-    environment = "Production" if os.getenv("RENDER") == "true" else "Development"
+    environment = "Production" if _IS_RENDER else "Development"
     print(f"🌍 البيئة: {environment}")
     print(f"🔗 Host: {os.getenv('DB_HOST', 'localhost')}")
     print(f"📦 Database: {os.getenv('DB_NAME', 'hawkstudio_db')}")
     
-    # تهيئة قاعدة البيانات فقط في البيئة المحلية
-    if os.getenv("RENDER") != "true":
-        print("\n🔧 تهيئة قاعدة البيانات المحلية...")
-        db.setup_database()
+    # تهيئة قاعدة البيانات عند الإقلاع (افتراضياً في البيئة المحلية فقط)
+    if _RUN_MIGRATIONS:
+        print("\n🔧 تهيئة قاعدة البيانات المحلية (في الخلفية)...")
+        db.setup_database_async()
     else:
-        print("\n⚡ بيئة Render - تشغيل بدون تهيئة قاعدة البيانات تلقائية")
-        print("💡 يمكن تهيئة قاعدة البيانات يدوياً من لوحة التحكم")
+        print("\n⚡ تشغيل بدون تهيئة قاعدة البيانات تلقائية")
+        print("💡 طبّق migrations/001_init.sql عند النشر، أو هيّئ قاعدة البيانات يدوياً من لوحة التحكم")
     
     # عرض حالة قاعدة البيانات
     if db.is_connected():
@@ -1381,7 +2135,7 @@ if __name__ == '__main__':
     
     # تشغيل التطبيق
     app.run(
-        debug=os.getenv("RENDER") != "true",  # Debug محلي فقط
+        debug=not _IS_RENDER,  # Debug محلي فقط
         host="0.0.0.0",
         port=port,
         threaded=True,
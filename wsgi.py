@@ -0,0 +1,13 @@
+"""WSGI entry point for production (Gunicorn with gevent workers).
+
+Start command:
+    gunicorn wsgi:app
+
+Worker settings are read from gunicorn.conf.py. `python server.py` remains
+the local development server.
+"""
+from server import app, db, _RUN_MIGRATIONS
+
+# نفس سلوك server.py: تهيئة الجداول عند الإقلاع فقط إذا طُلب ذلك (في الإنتاج تُطبَّق migrations/*.sql)
+if _RUN_MIGRATIONS:
+    db.setup_database_async()